@@ -0,0 +1,67 @@
+""" Data and layout builders shared by the benchmarks. """
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import xlcompose as xlc
+
+DTYPES = {
+    'float': ['float'],
+    'text': ['text'],
+    'mixed': ['text', 'text'] + ['float'] * 8,
+    'typed': ['text', 'int', 'date', 'float'],
+}
+
+
+def make_frame(rows, cols=10, seed=42, dtypes='mixed', nan_density=0.):
+    """ Loss-run style frame.  `dtypes` is a key of DTYPES whose kinds are
+    cycled across the columns and `nan_density` is the share of cells blanked
+    out at random.
+    """
+    rng = np.random.RandomState(seed)
+    kinds = DTYPES[dtypes]
+    data = {}
+    for num in range(cols):
+        kind = kinds[num % len(kinds)]
+        if kind == 'float':
+            values = rng.rand(rows) * 1e6
+        elif kind == 'int':
+            values = rng.randint(0, 1000, rows)
+        elif kind == 'date':
+            values = pd.Timestamp('2000-01-01') + pd.to_timedelta(
+                rng.randint(0, 9000, rows), unit='D')
+        else:
+            values = np.array(['C' + str(i) for i in range(rows)], dtype=object)
+        data[kind + '_' + str(num)] = values
+    data = pd.DataFrame(data)
+    if nan_density:
+        # Missing dates become NaT and are written as blanks like NaN
+        for column in data.columns:
+            mask = rng.rand(rows) < nan_density
+            data[column] = data[column].where(~mask)
+    return data
+
+
+def nest(exhibit, depth):
+    """ Wraps an exhibit in `depth` alternating Row/Column containers. """
+    for num in range(depth):
+        exhibit = (xlc.Row if num % 2 else xlc.Column)(
+            xlc.Title('Level ' + str(num)), exhibit)
+    return exhibit
+
+
+def output_size(exhibit):
+    buffer = BytesIO()
+    exhibit.to_excel(buffer)
+    return len(buffer.getvalue())
+
+
+def make_triangle(size, seed=42):
+    """ Actuarial triangle: a square of floats that is NaN below the
+    anti-diagonal, so a little under half of it is missing.
+    """
+    rng = np.random.RandomState(seed)
+    values = rng.rand(size, size) * 1e6
+    values[np.add.outer(np.arange(size), np.arange(size)) >= size] = np.nan
+    return pd.DataFrame(values, index=range(2000, 2000 + size),
+                        columns=range(12, 12 * (size + 1), 12))
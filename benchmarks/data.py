@@ -0,0 +1,105 @@
+""" Rendering cost of a single DataFrame by shape, dtype mix and NaN density,
+next to a plain ``pandas.DataFrame.to_excel`` of the same frame.
+"""
+from io import BytesIO
+
+import xlcompose as xlc
+
+from .common import make_frame, make_triangle, output_size
+
+
+class DataShape:
+    params = [[1000, 20000, 100000], [5, 20]]
+    param_names = ['rows', 'cols']
+    timeout = 600
+
+    def setup(self, rows, cols):
+        self.exhibit = xlc.DataFrame(make_frame(rows, cols))
+
+    def time_to_excel(self, rows, cols):
+        self.exhibit.to_excel(BytesIO())
+
+    def peakmem_to_excel(self, rows, cols):
+        self.exhibit.to_excel(BytesIO())
+
+    def track_output_size(self, rows, cols):
+        return output_size(self.exhibit)
+    track_output_size.unit = 'bytes'
+
+
+class DataKinds:
+    params = [['float', 'text', 'mixed', 'typed'], [0., 0.1, 0.5]]
+    param_names = ['dtypes', 'nan_density']
+    timeout = 600
+
+    def setup(self, dtypes, nan_density):
+        self.exhibit = xlc.DataFrame(make_frame(
+            20000, dtypes=dtypes, nan_density=nan_density))
+
+    def time_to_excel(self, dtypes, nan_density):
+        self.exhibit.to_excel(BytesIO())
+
+    def peakmem_to_excel(self, dtypes, nan_density):
+        self.exhibit.to_excel(BytesIO())
+
+    def track_output_size(self, dtypes, nan_density):
+        return output_size(self.exhibit)
+    track_output_size.unit = 'bytes'
+
+
+class Sparse:
+    """ Triangles written with and without skipping their missing cells """
+    params = [[100, 1000], [False, True]]
+    param_names = ['size', 'sparse']
+    timeout = 600
+
+    def setup(self, size, sparse):
+        self.exhibit = xlc.DataFrame(make_triangle(size), sparse=sparse)
+
+    def time_to_excel(self, size, sparse):
+        self.exhibit.to_excel(BytesIO())
+
+    def peakmem_to_excel(self, size, sparse):
+        self.exhibit.to_excel(BytesIO())
+
+    def track_output_size(self, size, sparse):
+        return output_size(self.exhibit)
+    track_output_size.unit = 'bytes'
+
+
+class Backends:
+    """ The same frames written cell by cell or straight into the table """
+    params = [[20000, 100000], ['mixed', 'typed'], ['xlsxwriter', 'table']]
+    param_names = ['rows', 'dtypes', 'backend']
+    timeout = 600
+
+    def setup(self, rows, dtypes, backend):
+        self.exhibit = xlc.DataFrame(make_frame(rows, dtypes=dtypes))
+
+    def time_to_excel(self, rows, dtypes, backend):
+        self.exhibit.to_excel(BytesIO(), backend=backend)
+
+    def peakmem_to_excel(self, rows, dtypes, backend):
+        self.exhibit.to_excel(BytesIO(), backend=backend)
+
+
+class PandasBaseline:
+    """ The same frames written by pandas alone, without formats or layout """
+    params = DataShape.params
+    param_names = DataShape.param_names
+    timeout = 600
+
+    def setup(self, rows, cols):
+        self.data = make_frame(rows, cols)
+
+    def time_to_excel(self, rows, cols):
+        self.data.to_excel(BytesIO(), engine='xlsxwriter')
+
+    def peakmem_to_excel(self, rows, cols):
+        self.data.to_excel(BytesIO(), engine='xlsxwriter')
+
+    def track_output_size(self, rows, cols):
+        buffer = BytesIO()
+        self.data.to_excel(buffer, engine='xlsxwriter')
+        return len(buffer.getvalue())
+    track_output_size.unit = 'bytes'
@@ -0,0 +1,70 @@
+""" Rendering cost of layouts: nesting depth, exhibit count and sheet count.
+Frames are kept small so the layout machinery dominates.
+"""
+from io import BytesIO
+
+import xlcompose as xlc
+
+from .common import make_frame, nest, output_size
+
+
+class NestingDepth:
+    params = [1, 10, 100, 1000]
+    param_names = ['depth']
+
+    def setup(self, depth):
+        self.data = make_frame(50)
+        self.exhibit = nest(xlc.DataFrame(self.data), depth)
+
+    def time_build(self, depth):
+        nest(xlc.DataFrame(self.data), depth)
+
+    def time_to_excel(self, depth):
+        self.exhibit.to_excel(BytesIO())
+
+    def peakmem_to_excel(self, depth):
+        self.exhibit.to_excel(BytesIO())
+
+
+class ExhibitCount:
+    params = [1, 10, 100]
+    param_names = ['exhibits']
+
+    def setup(self, exhibits):
+        data = make_frame(200)
+        self.exhibit = xlc.Column(*[
+            item for num in range(exhibits)
+            for item in (xlc.Title('Exhibit ' + str(num)),
+                         xlc.DataFrame(data), xlc.CSpacer())])
+
+    def time_to_excel(self, exhibits):
+        self.exhibit.to_excel(BytesIO())
+
+    def peakmem_to_excel(self, exhibits):
+        self.exhibit.to_excel(BytesIO())
+
+    def track_output_size(self, exhibits):
+        return output_size(self.exhibit)
+    track_output_size.unit = 'bytes'
+
+
+class SheetCount:
+    params = [1, 10, 50]
+    param_names = ['sheets']
+
+    def setup(self, sheets):
+        data = make_frame(1000)
+        self.exhibit = xlc.Tabs(*[
+            ('Sheet ' + str(num), xlc.Column(xlc.Title('Sheet ' + str(num)),
+                                             xlc.DataFrame(data)))
+            for num in range(sheets)])
+
+    def time_to_excel(self, sheets):
+        self.exhibit.to_excel(BytesIO())
+
+    def peakmem_to_excel(self, sheets):
+        self.exhibit.to_excel(BytesIO())
+
+    def track_output_size(self, sheets):
+        return output_size(self.exhibit)
+    track_output_size.unit = 'bytes'
@@ -0,0 +1,46 @@
+""" A YAML template against building the same layout directly. """
+from io import BytesIO
+
+import xlcompose as xlc
+
+from .common import make_frame
+
+TEMPLATE = '''
+Column:
+  {% for num in range(exhibits) %}
+  - Title:
+      data: ['{{ title }}', 'Exhibit {{ num }}']
+  - DataFrame:
+      data: {% eval %}data{% endeval %}
+      formats: {'float_2': '0.00'}
+  - CSpacer: {}
+  {% endfor %}
+'''
+
+
+def build_direct(data, title, exhibits):
+    return xlc.Column(*[
+        item for num in range(exhibits)
+        for item in (xlc.Title([title, 'Exhibit ' + str(num)]),
+                     xlc.DataFrame(data, formats={'float_2': '0.00'}),
+                     xlc.CSpacer())])
+
+
+class TemplateVsDirect:
+    params = [['template', 'direct'], [1, 20]]
+    param_names = ['construction', 'exhibits']
+
+    def setup(self, construction, exhibits):
+        self.data = make_frame(500)
+
+    def build(self, construction, exhibits):
+        if construction == 'template':
+            return xlc.load_yaml(TEMPLATE, data=self.data, title='Report',
+                                 exhibits=exhibits)
+        return build_direct(self.data, 'Report', exhibits)
+
+    def time_build(self, construction, exhibits):
+        self.build(construction, exhibits)
+
+    def time_build_and_render(self, construction, exhibits):
+        self.build(construction, exhibits).to_excel(BytesIO())
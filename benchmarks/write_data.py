@@ -0,0 +1,40 @@
+""" Cell throughput of ``_Workbook._write_data``.
+
+Benchmarks follow the airspeed velocity (asv) conventions but can also be run
+directly with ``python -m benchmarks.write_data`` to print cells per second.
+"""
+import time
+from io import BytesIO
+
+import xlcompose as xlc
+
+from .common import make_frame
+
+
+class WriteData:
+    params = [1000, 20000, 200000]
+    param_names = ['rows']
+    timeout = 600
+
+    def setup(self, rows):
+        self.exhibit = xlc.DataFrame(make_frame(rows))
+
+    def time_write_data(self, rows):
+        self.exhibit.to_excel(BytesIO())
+
+    def track_cells_per_second(self, rows):
+        return cells_per_second(self.exhibit)
+    track_cells_per_second.unit = 'cells/s'
+
+
+def cells_per_second(exhibit):
+    start = time.perf_counter()
+    exhibit.to_excel(BytesIO())
+    return exhibit.data.size / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    for rows in WriteData.params:
+        exhibit = xlc.DataFrame(make_frame(rows))
+        print('{:>8} rows: {:>12,.0f} cells/s'.format(
+            rows, cells_per_second(exhibit)))
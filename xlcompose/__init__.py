@@ -1,5 +1,7 @@
 __version__ = '0.3.2'
 from xlcompose.core import (
     Tabs, Sheet, Row, Column,
-    DataFrame, Series, CSpacer, RSpacer, Title, Image, VSpacer, HSpacer)
-from xlcompose.templates import load_json, load_yaml, EvalExtension
+    DataFrame, Series, CSpacer, RSpacer, Title, Image, VSpacer, HSpacer,
+    RenderStats)
+from xlcompose.templates import (
+    load_json, load_yaml, render_many, EvalExtension)
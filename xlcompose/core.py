@@ -1,17 +1,685 @@
 import pandas as pd
 import numpy as np
 import copy
-import json
+import functools
+import gc
+import hashlib
+import heapq
+import math
 import os
+import time
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
+from itertools import chain, repeat, zip_longest
+from operator import itemgetter
 import xlsxwriter
+import xlsxwriter.sharedstrings
+import xlsxwriter.worksheet
+try:
+    from xlsxwriter.worksheet import (
+        CellBlankTuple, CellBooleanTuple, CellNumberTuple, CellStringTuple)
+except ImportError:
+    try:
+        # Older releases of xlsxwriter name the cell tuples in snake case
+        from xlsxwriter.worksheet import (
+            cell_blank_tuple as CellBlankTuple,
+            cell_boolean_tuple as CellBooleanTuple,
+            cell_number_tuple as CellNumberTuple,
+            cell_string_tuple as CellStringTuple)
+    except ImportError:
+        # The 'table' backend is not available
+        CellNumberTuple = None
+from xlcompose import __version__
 import yaml
 
+# Size limits of an Excel worksheet
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_COLS = 16384
+
 settings = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'settings.yaml')
 with open(settings, 'r') as f:
     settings = yaml.load(f.read(),Loader=yaml.SafeLoader)
 
 
+_Geometry = namedtuple('_Geometry', ['height', 'width', 'row_heights'])
+
+
+def _measure(exhibit, attr='_geometry', combine='_combine',
+             leaf=lambda item: item):
+    """ Returns the geometry of an xlcompose object.  Containers are measured
+    bottom up in one iterative pass and cache their geometry in `attr` so
+    that sizing a layout visits each node once no matter how deeply it is
+    nested.  `combine` names the container method that merges the measures
+    of its contents and `leaf` measures a non-container object.  Caches are
+    stamped with the layout generation they were measured in and are stale
+    once any measured object changes, see `_XLCBase.__setattr__`.
+    """
+    if exhibit.__class__.__name__ not in ['Row', 'Column']:
+        return leaf(exhibit)
+    generation = _XLCBase._generation
+    stack = [(exhibit, False)]
+    while stack:
+        node, expanded = stack.pop()
+        cached = getattr(node, attr, None)
+        if cached is not None and cached[0] == generation:
+            continue
+        if expanded:
+            for item in node.args:
+                item._measured = True
+            setattr(node, attr, (generation, getattr(node, combine)(
+                [(item, getattr(item, attr)[1]
+                  if item.__class__.__name__ in ['Row', 'Column']
+                  else leaf(item)) for item in node.args])))
+        else:
+            stack.append((node, True))
+            stack.extend([(item, False) for item in node.args
+                          if item.__class__.__name__ in ['Row', 'Column']])
+    return getattr(exhibit, attr)[1]
+
+
+def _measure_widths(exhibit):
+    """ Returns the column widths of an xlcompose object.  These are measured
+    separately from the rest of the geometry since inferring the widths of a
+    DataFrame inspects its data and is deferred until the layout is rendered.
+    """
+    return _measure(exhibit, '_widths', '_combine_widths',
+                    lambda item: getattr(item, 'column_widths', []))
+
+
+def _html(exhibit):
+    """ Returns the HTML of the contents of a Row or Column.  Like the
+    geometry, the contents of containers are built bottom up in one iterative
+    pass and cached in `_html`, so a layout is only rendered again once it
+    changes or the `html_preview` settings do.
+    """
+    key = (_XLCBase._generation,
+           tuple(sorted(settings['html_preview'].items())))
+    stack = [(exhibit, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if getattr(node, '_html', None) is not None and node._html[0] == key:
+            continue
+        if expanded:
+            node._html = (key, node._contents_html())
+        else:
+            stack.append((node, True))
+            stack.extend([(item, False) for item in node.args
+                          if item.__class__.__name__ in ['Row', 'Column']])
+    return exhibit._html[1]
+
+
+class _SheetPlan:
+    """ The compiled layout of a worksheet.  Every non-container object is
+    placed on the cell of its top left corner by one iterative pass over the
+    layout and the column widths and row heights of the sheet are resolved.
+
+    Parameters
+    ----------
+    name : str
+        The sheet name in Excel
+    layout :
+        An xlcompose object
+    kwargs : dict
+        The worksheet settings of the layout and its `Sheet`
+    """
+
+    def __init__(self, name, layout, kwargs):
+        self.name = name
+        self.layout = layout
+        self.kwargs = kwargs
+        geometry = _measure(layout)
+        self.height = geometry.height
+        self.width = geometry.width
+        self.column_widths = _measure_widths(layout)
+        self.row_heights = geometry.row_heights
+        self.leaves = self._place(layout)
+        self.column_formats = {}
+
+    @staticmethod
+    def _place(layout):
+        """ Returns (exhibit, row, col) of each non-container object """
+        leaves = []
+        stack = [(layout, 0, 0)]
+        while stack:
+            exhibit, row, col = stack.pop()
+            klass = exhibit.__class__.__name__
+            if getattr(exhibit, 'title', None) is not None:
+                ## Special handling of title.  It must live in a Column
+                #  if it doesn't already
+                body = copy.copy(exhibit)
+                body.title = None
+                stack.append((Column(exhibit.title, body), row, col))
+            elif klass in ['Row', 'Column']:
+                ## Need to place each object in Row and Column args keeping
+                #  in mind the start_row and start_col of the container
+                placed = []
+                for item in exhibit.args:
+                    placed.append((item, row, col))
+                    if klass == 'Column':
+                        row = row + item.height
+                    if klass == 'Row':
+                        col = col + item.width
+                stack.extend(reversed(placed))
+            else:
+                leaves.append((exhibit, row, col))
+        return leaves
+
+
+def _compile(exhibits):
+    """ Compiles any xlcompose object into a list of `_SheetPlan`.  Sheets
+    beyond the size limits of Excel are split or rejected here, before any
+    cells are written.
+    """
+    if exhibits.__class__.__name__ == 'Sheet':
+        exhibits = Tabs(exhibits)
+    if exhibits.__class__.__name__ != 'Tabs':
+        exhibits = Tabs(Sheet('sheet1', exhibits))
+    plans = []
+    # Excel sheet names are case insensitive
+    taken = set(sheet.name.lower() for sheet in exhibits)
+    for sheet in exhibits:
+        plan = _SheetPlan(sheet.name, sheet.layout,
+                          dict(sheet.layout.kwargs, **sheet.kwargs))
+        if plan.height > EXCEL_MAX_ROWS or plan.width > EXCEL_MAX_COLS:
+            plans.extend(_overflow(plan, taken))
+        else:
+            plans.append(plan)
+    return plans
+
+
+def _overflow(plan, taken):
+    """ Splits a sheet holding a single DataFrame that is too big for Excel
+    into continuation sheets named 'name (2)', 'name (3)' and so on, each
+    with the header repeated.  Rows are split first, then columns.  Numbers
+    giving a name in the set of lower case sheet names `taken` are skipped
+    and the names given are added to it.
+    """
+    layout = plan.layout
+    if plan.kwargs.get('overflow') != 'split':
+        raise ValueError(
+            'Sheet {!r} is {} rows by {} columns, beyond the Excel limit of '
+            '{} rows by {} columns.  Set overflow=\'split\' on the Sheet or '
+            'DataFrame to continue it on further sheets.'.format(
+                plan.name, plan.height, plan.width, EXCEL_MAX_ROWS,
+                EXCEL_MAX_COLS))
+    if layout.__class__.__name__ != 'DataFrame':
+        raise ValueError(
+            'Sheet {!r} is too big for Excel and overflow=\'split\' only '
+            'applies to sheets holding a single DataFrame.'.format(plan.name))
+    if layout.chunks is not None:
+        raise ValueError(
+            'Sheet {!r} is too big for Excel and overflow=\'split\' does not '
+            'apply to chunked or deferred data.'.format(plan.name))
+    rows, cols = layout.data.shape
+    step_rows = EXCEL_MAX_ROWS - (plan.height - rows)
+    step_cols = EXCEL_MAX_COLS - (plan.width - cols)
+    widths = layout.column_widths
+    heights = layout.row_heights
+    lead = plan.height - rows
+    plans = []
+    for row in range(0, max(rows, 1), step_rows):
+        for col in range(0, max(cols, 1), step_cols):
+            chunk = layout._clone()
+            chunk.data = layout.data.iloc[row:row + step_rows,
+                                          col:col + step_cols]
+            chunk.nrows = chunk.data.shape[0]
+            chunk.height = lead + chunk.nrows
+            chunk.width = layout.index + chunk.data.shape[1]
+            chunk.column_widths = (
+                widths[:layout.index] +
+                widths[layout.index:][col:col + step_cols])
+            chunk.row_heights = heights[:lead] + heights[lead:][
+                row:row + step_rows]
+            name = plan.name
+            number = len(plans) + 1
+            while plans and name.lower() in taken:
+                suffix = ' ({})'.format(number)
+                name = plan.name[:31 - len(suffix)] + suffix
+                number += 1
+            taken.add(name.lower())
+            plans.append(_SheetPlan(name, chunk, plan.kwargs))
+    return plans
+
+
+class _CellBlock:
+    """ A rectangle of cells anchored at (`row`, `col`).  Cell values are
+    pulled lazily from `values(start, stop)` which must return an iterable of
+    lists, one per column, holding the rows in ``range(start, stop)``.  This
+    lets a block be written column by column or streamed row by row without
+    holding the whole rectangle in memory.  `writers` optionally names the
+    worksheet method writing each column, in which case missing values must
+    be None and are written as blanks in the format of `blanks`, a format
+    per column that defaults to `formats`.  Blanks without a format are not
+    written at all.
+    """
+    chunk_rows = 10000
+    # Blocks whose values must be read front to back are written row by row
+    ordered = False
+    # Missing cells left out as their blank format is None, counted as the
+    # block is written
+    skipped = 0
+
+    def __init__(self, row, col, height, formats, values, writers=None,
+                 blanks=None):
+        self.row = row
+        self.col = col
+        self.height = height
+        self.formats = formats
+        self.values = values
+        self.writers = writers
+        self.blanks = formats if blanks is None else blanks
+
+    def write(self, worksheet):
+        if self.ordered:
+            for row, block, cells in self.rows():
+                self.write_row(worksheet, row, cells)
+            return
+        if self.writers is None:
+            for num, (column, fmt) in enumerate(
+                    zip(self.values(0, self.height), self.formats)):
+                worksheet.write_column(self.row, self.col + num, column, fmt)
+            return
+        blank = worksheet._write_blank
+        for num, (column, fmt, writer, blank_fmt) in enumerate(zip(
+                self.values(0, self.height), self.formats, self.writers,
+                self.blanks)):
+            method = getattr(worksheet, writer)
+            col = self.col + num
+            for row, value in enumerate(column, self.row):
+                if value is None:
+                    blank(row, col, None, blank_fmt)
+                else:
+                    method(row, col, value, fmt)
+            if blank_fmt is None:
+                self.skipped += column.count(None)
+
+    def rows(self):
+        for start in range(0, self.height, self.chunk_rows):
+            stop = min(start + self.chunk_rows, self.height)
+            for num, cells in enumerate(zip(*self.values(start, stop))):
+                yield self.row + start + num, self, cells
+
+    def write_row(self, worksheet, row, cells):
+        if self.writers is None:
+            for num, (value, fmt) in enumerate(zip(cells, self.formats)):
+                worksheet.write(row, self.col + num, value, fmt)
+            return
+        for num, (value, fmt, writer, blank_fmt) in enumerate(
+                zip(cells, self.formats, self.writers, self.blanks)):
+            if value is None:
+                worksheet._write_blank(row, self.col + num, None, blank_fmt)
+                self.skipped += blank_fmt is None
+            else:
+                getattr(worksheet, writer)(row, self.col + num, value, fmt)
+
+
+def _xlsxwriter_backend(block, worksheet):
+    """ Writes a block cell by cell through the worksheet methods """
+    block.write(worksheet)
+
+
+def _table_backend(block, worksheet):
+    """ Stores the typed data columns of a block straight into the cell
+    table of a worksheet.  The bounds of the block are checked once rather
+    than per cell and strings are interned in the order the worksheet
+    methods would intern them, so the workbook is the same as one written by
+    `_xlsxwriter_backend`.  Other blocks, untyped columns and numbers that
+    are not finite are written by the worksheet methods.
+    """
+    if block.__class__.__name__ != '_CellBlock' or block.writers is None or \
+            block.ordered or worksheet.constant_memory or \
+            block.row < 0 or block.col < 0 or \
+            block.row + block.height > worksheet.xls_rowmax or \
+            block.col + len(block.formats) > worksheet.xls_colmax:
+        return block.write(worksheet)
+    # Filling the table makes no reference cycles, so the collector is
+    # paused rather than left to rescan the growing table
+    collect = gc.isenabled()
+    gc.disable()
+    try:
+        for num, (column, fmt, writer, blank_fmt) in enumerate(zip(
+                block.values(0, block.height), block.formats, block.writers,
+                block.blanks)):
+            _fill_column(worksheet, block.row, block.col + num, column, fmt,
+                         writer, blank_fmt)
+            if blank_fmt is None:
+                block.skipped += column.count(None)
+    finally:
+        if collect:
+            gc.enable()
+
+
+def _fill_column(worksheet, row, col, column, fmt, writer, blank_fmt):
+    """ Stores a column of values in the cell table of a worksheet """
+    rows = range(row, row + len(column))
+    present = [value for value in column if value is not None]
+    if writer == '_write_number' and all(map(math.isfinite, present)):
+        klass = CellNumberTuple
+    elif writer == '_write_boolean':
+        klass = CellBooleanTuple
+        present = [1 if value else 0 for value in present]
+    elif writer == '_write_string':
+        klass = CellStringTuple
+        present = _intern(worksheet, column, present)
+    else:
+        method = getattr(worksheet, writer)
+        for row, value in zip(rows, column):
+            if value is None:
+                worksheet._write_blank(row, col, None, blank_fmt)
+            else:
+                method(row, col, value, fmt)
+        return
+    if len(present) == len(column):
+        filled = rows
+    else:
+        filled = [row for row, value in zip(rows, column)
+                  if value is not None]
+    table = worksheet.table
+    # Cells are built in C by pairing each value with the format
+    for row, cell in zip(filled, map(functools.partial(tuple.__new__, klass),
+                                     zip(present, repeat(fmt)))):
+        table[row][col] = cell
+    written = filled
+    if blank_fmt is not None and len(filled) < len(column):
+        blank = CellBlankTuple(blank_fmt)
+        for row, value in zip(rows, column):
+            if value is None:
+                table[row][col] = blank
+        written = rows
+    if written:
+        worksheet._check_dimensions(written[0], col)
+        worksheet._check_dimensions(written[-1], col)
+
+
+def _intern(worksheet, column, present):
+    """ Adds the strings of a column to the shared string table of a
+    worksheet in bulk and returns their indices.  Each distinct string is
+    interned once, in order of first appearance as the worksheet methods
+    would, and the table is credited with the remaining references.
+    """
+    strings = worksheet.str_table
+    strmax = worksheet.xls_strmax
+    if type(column) is _Encoded:
+        codes = column.codes[column.codes >= 0]
+        used, first = np.unique(codes, return_index=True)
+        lookup = np.zeros(len(column.categories), dtype=np.int64)
+        for code in used[np.argsort(first)]:
+            lookup[code] = strings._get_shared_string_index(
+                column.categories[code][:strmax])
+        strings.count += len(codes) - len(used)
+        return lookup[codes].tolist()
+    present = [value[:strmax] for value in present]
+    distinct = dict.fromkeys(present)
+    for value in distinct:
+        strings._get_shared_string_index(value)
+    strings.count += len(present) - len(distinct)
+    return list(map(strings.string_table.__getitem__, present))
+
+
+def _table_backend_supported():
+    """ Whether the installed xlsxwriter has the internals `_table_backend`
+    fills in: the cell tuples, and the cell and shared string tables of a
+    worksheet.  They are private to xlsxwriter, so they are looked for
+    rather than assumed of any release.
+    """
+    if CellNumberTuple is None:
+        return False
+    worksheet = xlsxwriter.worksheet.Worksheet()
+    strings = xlsxwriter.sharedstrings.SharedStringTable()
+    return all(hasattr(worksheet, name) for name in [
+        'table', 'str_table', 'xls_rowmax', 'xls_colmax', 'xls_strmax',
+        'constant_memory', '_check_dimensions', '_write_blank']) and \
+        all(hasattr(strings, name) for name in [
+            'string_table', 'count', '_get_shared_string_index'])
+
+
+_BACKENDS = {'xlsxwriter': _xlsxwriter_backend}
+if _table_backend_supported():
+    _BACKENDS['table'] = _table_backend
+
+
+class _MergeBlock:
+    """ A single value spanning the cells (`row`, `col`) to
+    (`last_row`, `last_col`).  Single cell spans are written as plain cells.
+    """
+
+    def __init__(self, row, col, last_row, last_col, value, fmt=None):
+        self.row = row
+        self.col = col
+        self.last_row = last_row
+        self.last_col = last_col
+        self.value = value
+        self.fmt = fmt
+
+    def write(self, worksheet):
+        if (self.row, self.col) == (self.last_row, self.last_col):
+            worksheet.write(self.row, self.col, self.value, self.fmt)
+        else:
+            worksheet.merge_range(self.row, self.col, self.last_row,
+                                  self.last_col, self.value, self.fmt)
+
+    def rows(self):
+        yield self.row, self, None
+
+    def write_row(self, worksheet, row, cells):
+        # A merge that spans several rows would write blanks ahead of the
+        # rows still to be streamed, so only the anchor cell is kept.
+        if self.last_row == self.row:
+            self.write(worksheet)
+        else:
+            worksheet.write(self.row, self.col, self.value, self.fmt)
+
+
+class _ImageBlock(_MergeBlock):
+    """ An image inserted at (`row`, `col`) with the cells behind it merged """
+
+    def __init__(self, row, col, last_row, last_col, data, options):
+        super().__init__(row, col, last_row, last_col, '')
+        self.data = data
+        self.options = options
+
+    def write(self, worksheet):
+        worksheet.insert_image(self.row, self.col, self.data,
+                               options=self.options)
+        worksheet.merge_range(self.row, self.col, self.last_row,
+                              self.last_col, self.value)
+
+    def write_row(self, worksheet, row, cells):
+        if self.last_row == self.row:
+            self.write(worksheet)
+        else:
+            worksheet.insert_image(self.row, self.col, self.data,
+                                   options=self.options)
+
+
+class RenderStats:
+    """ Timings and counters of a render, returned by `to_excel` when stats
+    are requested.
+
+    Attributes
+    ----------
+    phases : dict
+        Seconds spent in each phase of the render: 'compile' (layout geometry
+        and column width inference), 'layout' (placing exhibits into blocks of
+        cells and registering their formats), 'write' (cell writes),
+        'properties' (worksheet settings), 'workers' (rendering standalone
+        sheet parts for worker processes or the cache) and 'close' (XML
+        serialization and zipping).
+    sheets : dict
+        Seconds spent rendering each sheet by sheet name.
+    cells, merges, images : int
+        Number of cells written, ranges merged and images inserted.
+    formats_created, formats_reused : int
+        Format lookups that created an xlsxwriter format or reused one.
+    sheets_reused : int
+        Sheets taken unchanged from the part cache.
+    hooks : list
+        Callables invoked as ``hook(kind, name, seconds)`` each time a phase
+        (kind 'phases') or a sheet (kind 'sheets') finishes.
+    """
+
+    def __init__(self, hooks=()):
+        self.phases = {}
+        self.sheets = {}
+        self.cells = 0
+        self.merges = 0
+        self.images = 0
+        self.formats_created = 0
+        self.formats_reused = 0
+        self.sheets_reused = 0
+        self.hooks = list(hooks)
+
+    def __repr__(self):
+        return '{}(phases={}, sheets={}, cells={}, merges={}, images={}, ' \
+            'formats_created={}, formats_reused={}, sheets_reused={})'.format(
+                self.__class__.__name__, self.phases, self.sheets,
+                self.cells, self.merges, self.images, self.formats_created,
+                self.formats_reused, self.sheets_reused)
+
+    def start(self):
+        return time.perf_counter()
+
+    def stop(self, kind, name, start):
+        """ Adds the seconds since `start` to `name` of `kind` """
+        seconds = time.perf_counter() - start
+        timings = getattr(self, kind)
+        timings[name] = timings.get(name, 0.) + seconds
+        for hook in self.hooks:
+            hook(kind, name, seconds)
+
+    def count(self, blocks):
+        for block in blocks:
+            if block.__class__.__name__ == '_CellBlock':
+                self.cells += block.height * len(block.formats) - block.skipped
+                continue
+            if block.__class__.__name__ == '_TableBlock':
+                if block.options['header_row']:
+                    self.cells += block.last_col - block.col + 1
+                continue
+            if block.__class__.__name__ == '_ImageBlock':
+                self.images += 1
+            else:
+                self.cells += 1
+            if (block.row, block.col) != (block.last_row, block.last_col):
+                self.merges += 1
+
+    def update(self, other):
+        """ Adds the sheets and counters of a render done elsewhere """
+        self.sheets.update(other.sheets)
+        self.cells += other.cells
+        self.merges += other.merges
+        self.images += other.images
+
+
+class _NoStats:
+    """ Stands in for RenderStats when a render is not instrumented """
+    sheets_reused = 0
+
+    def start(self):
+        return None
+
+    def stop(self, kind, name, start):
+        pass
+
+    def count(self, blocks):
+        pass
+
+    def update(self, other):
+        pass
+
+
+class _TableBlock:
+    """ An Excel table spanning the cells (`row`, `col`) to
+    (`last_row`, `last_col`).  Its header row is written with the table and
+    the cells of its body are written by other blocks.
+    """
+
+    def __init__(self, row, col, last_row, last_col, options):
+        self.row = row
+        self.col = col
+        self.last_row = last_row
+        self.last_col = last_col
+        self.options = options
+
+    def write(self, worksheet):
+        # xlsxwriter fills in the options it is given, so pass it fresh
+        # containers holding the same registered formats
+        options = dict(self.options, columns=[
+            dict(column) for column in self.options['columns']])
+        worksheet.add_table(self.row, self.col, self.last_row, self.last_col,
+                            options)
+
+    def rows(self):
+        yield self.row, self, None
+
+    def write_row(self, worksheet, row, cells):
+        self.write(worksheet)
+
+
+class _FormatRegistry:
+    """ Workbook-wide registry of xlsxwriter formats.  Format properties are
+    layered over the workbook's `default_formats` and keyed by a canonical
+    hashable form so that each distinct format is added to the workbook once
+    no matter how many exhibits ask for it.
+
+    Attributes
+    ----------
+    hits : int
+        Number of requests served by an already registered format
+    misses : int
+        Number of requests that added a new format to the workbook
+    """
+
+    def __init__(self, book, default_formats):
+        self.book = book
+        self.default_formats = default_formats
+        self.formats = {}
+        self.properties = []
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, properties):
+        """ Returns the format for a dict of xlsxwriter format properties or a
+        `num_format` string.
+        """
+        if type(properties) is str:
+            properties = {'num_format': properties}
+        elif type(properties) is not dict:
+            raise ValueError('Cannot infer format ' + str(properties))
+        merged = self.default_formats.copy()
+        merged.update(properties)
+        key = self._key(merged)
+        fmt = self.formats.get(key)
+        if fmt is None:
+            self.misses += 1
+            fmt = self.formats[key] = self.book.add_format(merged)
+            self.properties.append(merged)
+        else:
+            self.hits += 1
+        return fmt
+
+    def freeze(self, properties=()):
+        """ Registers `properties` in order and then fixes the XF index of
+        every registered format.  xlsxwriter otherwise numbers formats by
+        first use, so freezing lets workbooks rendered in separate processes
+        share one format table.
+        """
+        for item in properties:
+            self.get(item)
+        for fmt in self.formats.values():
+            fmt._get_xf_index()
+
+    @classmethod
+    def _key(cls, value):
+        if type(value) is dict:
+            return tuple(sorted((k, cls._key(v)) for k, v in value.items()))
+        if type(value) in (list, tuple):
+            return tuple(cls._key(v) for v in value)
+        return value
+
+
 class _Workbook:
     """
     Excel Workbook level configurations.  This is not part of the end_user API.
@@ -21,93 +689,249 @@ class _Workbook:
 
     """
 
-    def __init__(self, workbook_path, exhibits, default_formats):
+    def __init__(self, workbook_path, exhibits, default_formats,
+                 constant_memory=False, workers=None, stats=None,
+                 cache_dir=None, column_formats=False, backend='xlsxwriter'):
         """ Initialize the writer object
         """
-        self.formats = {}
-        self.writer = pd.ExcelWriter(workbook_path)
+        # Sheets rendered in worker processes or taken from the cache are
+        # spliced into the package once it is complete, so the workbook is
+        # first assembled in memory.
+        target = BytesIO() if workers or cache_dir else workbook_path
+        constant_memory = constant_memory or bool(workers) or bool(cache_dir)
+        if constant_memory:
+            self.writer = pd.ExcelWriter(
+                target, engine='xlsxwriter',
+                engine_kwargs={'options': {'constant_memory': True}})
+        elif hasattr(target, 'write'):
+            # Streams get the package straight from memory, not temp files
+            self.writer = pd.ExcelWriter(
+                target, engine='xlsxwriter',
+                engine_kwargs={'options': {'in_memory': True}})
+        else:
+            self.writer = pd.ExcelWriter(target)
+        self.target = target
         self.exhibits = exhibits
         self.workbook_path = workbook_path
         self.default_formats = {} if default_formats is None else default_formats
+        self.formats = _FormatRegistry(self.writer.book, self.default_formats)
+        self.constant_memory = constant_memory
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.column_formats = column_formats
+        if callable(backend):
+            self.backend = backend
+        elif backend in _BACKENDS:
+            self.backend = _BACKENDS[backend]
+        else:
+            raise ValueError('backend must be one of {} or a callable'.format(
+                sorted(_BACKENDS)))
+        self.stats = _NoStats() if stats is None else stats
 
     def to_excel(self):
         """ Outputs object to Excel.
 
-        Parameters:
-        -----------
-        workbook_path : str
-            The target path and filename of the Excel document
+        Returns
+        -------
+            The RenderStats of the render if it is instrumented
         """
-        self.exhibits = copy.deepcopy(self.exhibits)
-        if self.exhibits.__class__.__name__ == 'Sheet':
-            self.exhibits = Tabs(self.exhibits)
-        if self.exhibits.__class__.__name__ != 'Tabs':
-            self.exhibits = Tabs(Sheet('sheet1', self.exhibits))
-        for sheet in self.exhibits:
-            self._write(sheet.layout, sheet.name)
-            sheet.layout.kwargs.update(sheet.kwargs)
-            self._set_worksheet_properties(sheet.layout, sheet.name)
+        stats = self.stats
+        start = stats.start()
+        sheets = _compile(self.exhibits)
+        stats.stop('phases', 'compile', start)
+        if self.constant_memory:
+            # Sheets are streamed in row order, so formats are numbered in
+            # layout order up front rather than in order of first use.
+            start = stats.start()
+            for sheet in sheets:
+                for leaf, row, col in sheet.leaves:
+                    self._blocks(leaf, None, row, col)
+            self.formats.freeze()
+            stats.stop('phases', 'layout', start)
+        if self.workers or self.cache_dir:
+            self._write_parts(sheets)
+        else:
+            for sheet in sheets:
+                sheet_start = stats.start()
+                if self.constant_memory:
+                    self._stream(sheet)
+                else:
+                    self._write(sheet)
+                    start = stats.start()
+                    self._set_worksheet_properties(sheet)
+                    stats.stop('phases', 'properties', start)
+                stats.stop('sheets', sheet.name, sheet_start)
+            self._close()
+        if isinstance(stats, RenderStats):
+            stats.formats_created = self.formats.misses
+            stats.formats_reused = self.formats.hits
+            return stats
+
+    def _close(self):
+        start = self.stats.start()
         self.writer.close()
-
-
-    def _write(self, exhibit, sheet, start_row=0, start_col=0):
+        self.stats.stop('phases', 'close', start)
+
+    def _write_parts(self, sheets):
+        """ Renders sheets into standalone worksheet parts, either in a pool
+        of worker processes or taken from the part cache, and splices them
+        into the package assembled here.  Each part is streamed into a
+        workbook of its own that shares the format table of this one.
+        Strings are written inline, so the parts are self contained.  Sheets
+        whose parts refer to other parts of the package, like images and
+        hyperlinks, and sheets of chunked or deferred data are rendered here
+        instead.
+        """
+        names = [sheet.name for sheet in sheets]
+        remote = [
+            num for num, sheet in enumerate(sheets)
+            if names.count(sheet.name) == 1 and not any(
+                leaf.__class__.__name__ == 'Image' or
+                getattr(leaf, 'chunks', None) is not None
+                for leaf, row, col in sheet.leaves)]
+        stats = self.stats
+        parts, fingerprints = {}, {}
+        if self.cache_dir:
+            for num in remote:
+                fingerprints[num] = _fingerprint(
+                    sheets[num], (num == 0, self.column_formats),
+                    self.formats.properties)
+                parts[num] = fingerprints[num] and _read_part(
+                    self.cache_dir, fingerprints[num])
+            remote = [num for num in remote if parts[num] is None]
+            stats.sheets_reused += len(fingerprints) - len(remote)
+        jobs = [(sheets[num], num, self.formats.properties,
+                 self.default_formats, isinstance(stats, RenderStats),
+                 self.column_formats)
+                for num in remote]
+        start = stats.start()
+        if self.workers:
+            with ProcessPoolExecutor(self.workers) as pool:
+                results = list(pool.map(_render_sheet, jobs))
+        else:
+            results = [_render_sheet(job) for job in jobs]
+        stats.stop('phases', 'workers', start)
+        for num, (part, sheet_stats) in zip(remote, results):
+            parts[num] = part
+            if part is not None:
+                stats.update(sheet_stats)
+                if fingerprints.get(num):
+                    _write_part(self.cache_dir, fingerprints[num], part)
+        for num, sheet in enumerate(sheets):
+            self._create_sheet(sheet.name)
+            if parts.get(num) is None:
+                start = stats.start()
+                self._stream(sheet)
+                stats.stop('sheets', sheet.name, start)
+            else:
+                start = stats.start()
+                self._set_worksheet_properties(sheet)
+                stats.stop('phases', 'properties', start)
+        self._close()
+        positions = [worksheet.name
+                     for worksheet in self.writer.book.worksheets()]
+        _splice(self.target, self.workbook_path, {
+            'xl/worksheets/sheet{}.xml'.format(
+                positions.index(sheets[num].name) + 1): part
+            for num, part in parts.items() if part is not None})
+
+    def _write(self, sheet):
         """
         Parameters
         ----------
-        exhibit :
-            An xlcompose object
-        sheet : str
-            The sheet name in Excel to write to
-        start_row : int
-            The starting row on which to write the exhibit
-        start_col : int
-            The starting column on which to write the exhibit
+        sheet : _SheetPlan
+            The compiled layout of the worksheet to write
+        """
+        stats = self.stats
+        worksheet = self._create_sheet(sheet.name)
+        start = stats.start()
+        blocks = self._sheet_blocks(sheet, worksheet)
+        stats.stop('phases', 'layout', start)
+        start = stats.start()
+        for block in blocks:
+            self.backend(block, worksheet)
+        stats.stop('phases', 'write', start)
+        stats.count(blocks)
+
+    def _stream(self, sheet):
+        """ Writes a sheet in strictly ascending row order as required by
+        xlsxwriter's `constant_memory` mode.  The rows of the blocks of all
+        leaves in the compiled layout are merged so that a `Row` of tall
+        exhibits is emitted across its full width one row at a time.
+        Worksheet properties are set before any cell is written because row
+        settings cannot be applied to rows that have already been flushed.
+        """
+        stats = self.stats
+        worksheet = self._create_sheet(sheet.name)
+        start = stats.start()
+        blocks = self._sheet_blocks(sheet, worksheet)
+        stats.stop('phases', 'layout', start)
+        start = stats.start()
+        self._set_worksheet_properties(sheet)
+        stats.stop('phases', 'properties', start)
+        start = stats.start()
+        for row, block, cells in heapq.merge(
+                *[block.rows() for block in blocks], key=itemgetter(0)):
+            block.write_row(worksheet, row, cells)
+        stats.stop('phases', 'write', start)
+        stats.count(blocks)
+
+    def _sheet_blocks(self, sheet, worksheet):
+        """ Lays out every leaf of a sheet.  With `column_formats`, formats
+        that can be set on whole sheet columns are moved there from the cells.
+        """
+        blocks = [block
+                  for leaf, row, col in sheet.leaves
+                  for block in self._blocks(leaf, worksheet, row, col)]
+        if self.column_formats:
+            sheet.column_formats = _column_formats(blocks)
+            for block in blocks:
+                if block.__class__.__name__ == '_CellBlock' and \
+                        block.writers is not None:
+                    block.formats = [
+                        None if block.col + num in sheet.column_formats
+                        else fmt for num, fmt in enumerate(block.formats)]
+                    block.blanks = [
+                        None if block.col + num in sheet.column_formats
+                        else fmt for num, fmt in enumerate(block.blanks)]
+        return blocks
+
+    def _create_sheet(self, sheet):
+        """ Create sheet if it doesn't already exist """
+        try:
+            return self.writer.sheets[sheet]
+        except:
+            pd.DataFrame().to_excel(self.writer, sheet_name=sheet)
+            return self.writer.sheets[sheet]
+
+    def _blocks(self, exhibit, worksheet, start_row, start_col):
+        """ Lays out a non-container object at (`start_row`, `start_col`) and
+        returns the blocks of cells it renders to.  Placement is passed
+        along rather than stored on the exhibit so that layouts sharing
+        objects can be rendered any number of times.
         """
-        # Get xlcompose object for special handling
         klass = exhibit.__class__.__name__
-        if getattr(exhibit, 'title', None) is not None:
-            ## Special handling of title.  It must live in a Column
-            #  if it doesn't already
-            t = copy.deepcopy(exhibit.title)
-            exhibit.title = None
-            exhibit = Column(t, exhibit)
-            self._write(exhibit, sheet, start_row, start_col)
-        elif klass in ['Row', 'Column']:
-            ## Need to render each object in Row and Column args keeping in
-            #  mind the start_row and start_col of the container
-            start_row = start_row
-            start_col = start_col
-            for item in exhibit.args:
-                self._write(item, sheet, start_row, start_col)
-                if klass == 'Column':
-                    start_row = start_row + item.height
-                if klass == 'Row':
-                   start_col = start_col + item.width
-        else:
-            # General rendering for Non-container objects
-            exhibit.start_row = start_row
-            exhibit.start_col = start_col
-            exhibit.sheet_name = sheet
-            # Create sheet if it doesn't already exist
-            try:
-                exhibit.worksheet = self.writer.sheets[exhibit.sheet_name]
-            except:
-                pd.DataFrame().to_excel(self.writer, sheet_name=exhibit.sheet_name)
-                exhibit.worksheet = self.writer.sheets[exhibit.sheet_name]
-
-            if klass in ['DataFrame', 'RSpacer', 'CSpacer']:
-                if exhibit.header:
-                    self._write_header(exhibit)
-                if exhibit.index:
-                    self._write_index(exhibit)
-                self._register_formats(exhibit)
-                self._write_data(exhibit)
-            if klass in ['Title', 'Series']:
-                self._write_series(exhibit)
-            if klass == 'Image':
-                self._write_image(exhibit)
-
-    def _set_worksheet_properties(self, exhibit, sheet):
+        args = (exhibit, worksheet, start_row, start_col)
+        blocks = []
+        if klass in ['DataFrame', 'RSpacer', 'CSpacer']:
+            if getattr(exhibit, 'table', False) and exhibit.nrows:
+                if self.constant_memory:
+                    raise ValueError(
+                        'Excel tables are not available in constant_memory '
+                        'mode, which workers and cache_dir also use.')
+                blocks.extend(self._table_blocks(*args))
+            elif exhibit.header:
+                blocks.extend(self._header_blocks(*args))
+            if exhibit.index:
+                blocks.extend(self._index_blocks(*args))
+            blocks.extend(self._data_blocks(*args))
+        if klass in ['Title', 'Series']:
+            blocks.extend(self._series_blocks(*args))
+        if klass == 'Image':
+            blocks.extend(self._image_blocks(*args))
+        return blocks
+
+    def _set_worksheet_properties(self, sheet):
         """ Set worksheet level properties. Called once the entire sheet has
         been rendered. These set worksheet level settings and in many cases is
         a straight pass through to xlsxwriter.  Can we inspect the xlsxwriter
@@ -115,102 +939,82 @@ class _Workbook:
 
         Parameters
         ----------
-        exhibit :
-            An xlcompose object
-        sheet : str
-            The sheet name in Excel to write to
+        sheet : _SheetPlan
+            The compiled layout of the worksheet
         """
-        exhibit.worksheet = self.writer.sheets[sheet]
+        worksheet = self.writer.sheets[sheet.name]
         widths = [min(settings['max_column_width'], item)
-                  for item in exhibit.column_widths]
+                  for item in sheet.column_widths]
         heights = [min(settings['max_row_height'], item) if item is not None else item
-                   for item in exhibit.row_heights]
+                   for item in sheet.row_heights]
+        kwargs = sheet.kwargs
         for num, item in enumerate(widths):
-            exhibit.worksheet.set_column(num, num, item)
+            worksheet.set_column(num, num, item, sheet.column_formats.get(num))
         for num, item in enumerate(heights):
             if item is not None:
-                exhibit.worksheet.set_row(num, item)
-        kwargs = exhibit.kwargs
-        exhibit.worksheet.fit_to_pages(*kwargs.get('fit_to_pages', (1,0)))
+                worksheet.set_row(num, item)
+        worksheet.fit_to_pages(*kwargs.get('fit_to_pages', (1,0)))
         bool_funcs = [
             'set_page_view', 'print_row_col_headers', 'hide_row_col_headers',
             'center_vertically', 'center_horizontally']
         for func in bool_funcs:
             if kwargs.get(func):
-                getattr(exhibit.worksheet, func)()
+                getattr(worksheet, func)()
         passthru_funcs = [
             'hide_gridlines', 'set_print_scale', 'set_start_page', 'set_paper'
             'set_h_pagebreaks', 'set_v_pagebreaks', 'print_across']
         for func in passthru_funcs:
             if kwargs.get(func):
-                getattr(exhibit.worksheet, func)(kwargs[func])
+                getattr(worksheet, func)(kwargs[func])
         starg_funcs = [
             'freeze_panes', 'repeat_rows', 'repeat_columns', 'set_margins',
             'print_area']
         for func in starg_funcs:
             if kwargs.get(func):
-                getattr(exhibit.worksheet, func)(*kwargs[func])
+                getattr(worksheet, func)(*kwargs[func])
         if kwargs.get('set_header', None) is not None:
             if type(kwargs['set_header']) is list:
-                exhibit.worksheet.set_header('\n'.join(kwargs['set_header']))
+                worksheet.set_header('\n'.join(kwargs['set_header']))
             else:
-                exhibit.worksheet.set_header(kwargs['set_header'])
+                worksheet.set_header(kwargs['set_header'])
         if kwargs.get('set_footer', None) is not None:
             if type(kwargs['set_footer']) is list:
-                exhibit.worksheet.set_footer('\n'.join(kwargs['set_footer']))
+                worksheet.set_footer('\n'.join(kwargs['set_footer']))
             else:
-                exhibit.worksheet.set_footer(kwargs['set_footer'])
+                worksheet.set_footer(kwargs['set_footer'])
         if kwargs.get('set_landscape'):
-            exhibit.worksheet.set_landscape()
+            worksheet.set_landscape()
         elif kwargs.get('set_portrait'):
-            exhibit.worksheet.set_portrait()
+            worksheet.set_portrait()
         else:
             if sum(widths) > settings['max_portrait_width']:
-                exhibit.worksheet.set_landscape()
+                worksheet.set_landscape()
             else:
-                exhibit.worksheet.set_portrait()
+                worksheet.set_portrait()
 
-    def _write_series(self, exhibit):
-        """ Writes a Series or Title object.  Special considerations are
+    def _series_blocks(self, exhibit, worksheet, start_row, start_col):
+        """ Lays out a Series or Title object.  Special considerations are
         that these objects can take a format list that applies to each element
         of the Series.  These also merge cells to span their designated `width`.
         """
-        start_row = exhibit.start_row
-        start_col = exhibit.start_col
-        end_row = start_row + exhibit.height
         end_col = start_col + exhibit.width - 1
-        row_rng = range(start_row, end_row)
-        title_format = []
-        for item in exhibit.title_formats:
-            v = self.default_formats.copy()
-            v.update(item)
-            title_format.append(self.writer.book.add_format(v))
-        if exhibit.width > 1:
-            for r in row_rng:
-                exhibit.worksheet.merge_range(
-                    r, start_col, r, end_col,
-                    exhibit.data.iloc[r - start_row][0],
-                    title_format[r - start_row])
-        else:
-            for r in row_rng:
-                exhibit.worksheet.write(
-                    r, start_col,
-                    exhibit.data.iloc[r - start_row][0],
-                    title_format[r - start_row])
-
-    def _write_image(self, exhibit):
-        """ Writes an image object and merges the cells behind it based on the
-        images designated `height` and `width`
+        title_format = [self.formats.get(item)
+                        for item in exhibit.title_formats]
+        return [_MergeBlock(start_row + num, start_col, start_row + num,
+                            end_col, value, title_format[num])
+                for num, value in enumerate(
+                    exhibit.data.iloc[:exhibit.height, 0].tolist())]
+
+    def _image_blocks(self, exhibit, worksheet, start_row, start_col):
+        """ Lays out an image object and merges the cells behind it based on
+        the images designated `height` and `width`
         """
-        exhibit.worksheet.insert_image(
-            exhibit.start_row, exhibit.start_col, exhibit.data,
-            options=exhibit.formats)
-        exhibit.worksheet.merge_range(
-            exhibit.start_row, exhibit.start_col,
-            exhibit.start_row + exhibit.height - 1,
-            exhibit.start_col + exhibit.width - 1, '')
-
-    def _write_header(self, exhibit):
+        return [_ImageBlock(
+            start_row, start_col,
+            start_row + exhibit.height - 1, start_col + exhibit.width - 1,
+            exhibit.data, exhibit.formats)]
+
+    def _header_blocks(self, exhibit, worksheet, start_row, start_col):
         ''' Adds column headers to data table '''
         if type(exhibit.data.columns) == pd.PeriodIndex:
             headers = exhibit.data.columns.astype(str)
@@ -218,107 +1022,587 @@ class _Workbook:
             headers = exhibit.data.columns
         if exhibit.index:
             headers = [exhibit.index_label]+list(headers)
-        header_format = self.default_formats.copy()
-        header_format.update(exhibit.header_formats)
-        header_format = self.writer.book.add_format(header_format)
-        for col_num, value in enumerate(headers):
-            exhibit.worksheet.write(
-                exhibit.start_row,
-                col_num + exhibit.start_col,
-                value, header_format)
-            if exhibit.col_nums:
-                exhibit.worksheet.write(
-                    exhibit.start_row + 1, col_num, -col_num-1, header_format)
-
-    def _write_index(self, exhibit):
+        headers = [[item] for item in headers]
+        header_format = self.formats.get(exhibit.header_formats)
+        blocks = [_CellBlock(
+            start_row, start_col, 1,
+            [header_format] * len(headers), lambda start, stop: headers)]
+        if exhibit.col_nums:
+            col_nums = [[-col_num-1] for col_num in range(len(headers))]
+            blocks.append(_CellBlock(
+                start_row + 1, 0, 1,
+                [header_format] * len(headers), lambda start, stop: col_nums))
+        return blocks
+
+    def _table_blocks(self, exhibit, worksheet, start_row, start_col):
+        ''' Lays out a DataFrame as an Excel table.  The table writes the
+        headers and carries the format of each column, and the style of the
+        table takes the place of the header format.
+        '''
+        data = exhibit.data
+        col_formats = self._register_formats(exhibit)
+        headers = [str(item) for item in data.columns]
+        formats = [col_formats[column] for column in data.columns]
+        if exhibit.index:
+            headers = [str(exhibit.index_label or data.index.name or 'index')
+                       ] + headers
+            formats = [self.formats.get(exhibit.index_formats)] + formats
+        options = {
+            'header_row': bool(exhibit.header),
+            'columns': [{'header': header, 'format': fmt}
+                        for header, fmt in zip(headers, formats)]}
+        if exhibit.table_style is not None:
+            options['style'] = exhibit.table_style
+        return [_TableBlock(
+            start_row, start_col,
+            start_row + bool(exhibit.header) + exhibit.nrows - 1,
+            start_col + len(headers) - 1, options)]
+
+    def _index_blocks(self, exhibit, worksheet, start_row, start_col):
         ''' Adds row index to data table '''
-        index_format = self.default_formats.copy()
-        index_format.update(exhibit.index_formats)
-        index_format = self.writer.book.add_format(index_format)
-        for row_num, value in enumerate(exhibit.data.index.astype(str)):
-            exhibit.worksheet.write(
-                row_num + exhibit.start_row + exhibit.header + \
-                exhibit.col_nums,
-                exhibit.start_col,
-                value, index_format)
-            exhibit.worksheet.set_column(
-                first_col=exhibit.start_col, last_col=exhibit.start_col,
-                width=exhibit.column_widths[0])
+        if getattr(exhibit, 'chunks', None) is not None:
+            # Written along with the data as both come from the same chunks
+            return []
+        index_format = self.formats.get(exhibit.index_formats)
+        index = exhibit.data.index
+        return [_CellBlock(
+            start_row + exhibit.header + exhibit.col_nums,
+            start_col, len(index), [index_format],
+            lambda start, stop: [index[start:stop].astype(str).tolist()])]
 
     def _register_formats(self, exhibit):
         """
-        Registers all unique user-defined formats with the Workbook
+        Registers all unique user-defined formats with the Workbook and
+        returns the format assigned to each column of the exhibit.
         """
-        for num, k in enumerate(exhibit.formats.keys()):
-            # Add unique formats
-            v = exhibit.formats[k]
-            if type(v) is dict:
-                col_formats = v
-            elif type(v) is str:
-                col_formats = {'num_format': v}
-            else:
-                raise ValueError('Cannot infer format ' + str(v))
-            col_formats = self.default_formats.copy()
-            col_formats.update(v)
-            if self.formats.get(json.dumps(col_formats), None) is None:
-                self.formats[json.dumps(col_formats)] = \
-                    self.writer.book.add_format(col_formats)
-
-        for k in exhibit.formats.keys():
-            # Assign formats to columns
-            v = self.default_formats.copy()
-            v.update(exhibit.formats[k])
-            exhibit.formats[k] = self.formats[json.dumps(v)]
-
-    def _write_data(self, exhibit):
-        start_row = exhibit.start_row + exhibit.col_nums + exhibit.header
-        start_col = exhibit.start_col + exhibit.index
-        end_row = start_row + exhibit.data.shape[0]
-        end_col = start_col + exhibit.data.shape[1]
-        row_rng = range(start_row, end_row)
-        col_rng = range(start_col, end_col)
-        d = exhibit.data.fillna('').values
-        for c in col_rng:
-            c_idx = c - exhibit.index - exhibit.start_col
-            fmt = exhibit.formats[exhibit.data.columns[c_idx]]
-            for r in row_rng:
-                r_idx = r - exhibit.col_nums - exhibit.header - \
-                        exhibit.start_row
-                exhibit.worksheet.write(r, c, d[r_idx, c_idx], fmt)
-                if r == start_row:
-                    exhibit.worksheet.set_column(
-                        first_col=c, last_col=c,
-                        width=exhibit.column_widths[c_idx + exhibit.index])
+        return {k: self.formats.get(v) for k, v in exhibit.formats.items()}
+
+    def _data_blocks(self, exhibit, worksheet, start_row, start_col):
+        """ Lays out the body of a DataFrame.  Formats are resolved once per
+        column and each column is written by the xlsxwriter method of its
+        dtype, see `_column_writer`.  Column widths are set for the whole
+        sheet from its compiled layout.
+        """
+        start_row = start_row + exhibit.col_nums + exhibit.header
+        start_col = start_col + exhibit.index
+        data = exhibit.data
+        col_formats = self._register_formats(exhibit)
+        formats = [col_formats[column] for column in data.columns]
+        writers = [_column_writer(data.iloc[:, c_idx])
+                   for c_idx in range(data.shape[1])]
+        blanks = formats
+        if getattr(exhibit, 'sparse', False):
+            # Missing cells are skipped unless their format shows when empty
+            blanks = [fmt if _visible_when_blank(fmt) else None
+                      for fmt in formats]
+        if getattr(exhibit, 'chunks', None) is not None:
+            return [self._chunked_block(
+                exhibit, start_row, start_col, formats, writers, blanks)]
+
+        encode = getattr(exhibit, 'dictionary_encode', False)
+
+        def values(start, stop):
+            for c_idx, writer in enumerate(writers):
+                yield _column_values(
+                    data.iloc[start:stop, c_idx], writer, encode)
+
+        return [_CellBlock(start_row, start_col, data.shape[0], formats,
+                           values, writers, blanks)]
+
+    def _chunked_block(self, exhibit, start_row, start_col, formats, writers,
+                       blanks):
+        """ Lays out the index and body of a DataFrame whose data is an
+        iterator of chunks or deferred.  The chunks are read front to back as
+        rows are written, so the block is always written in row order.
+        """
+        # Object columns of a schema say nothing about the values to come
+        writers = ['_write' if dtype == object else writer
+                   for writer, dtype in zip(writers, exhibit.data.dtypes)]
+        reader = _ChunkReader(exhibit.chunks, exhibit.nrows, exhibit.data)
+        index = exhibit.index
+        columns = list(enumerate(writers))
+        encode = exhibit.dictionary_encode
+
+        def values(start, stop):
+            frame = reader.read(start, stop)
+            if index:
+                yield frame.index.astype(str).tolist()
+            for c_idx, writer in columns:
+                yield _column_values(frame.iloc[:, c_idx], writer, encode)
+
+        if index:
+            index_format = self.formats.get(exhibit.index_formats)
+            formats = [index_format] + formats
+            writers = ['_write'] + writers
+            blanks = [index_format] + blanks
+            start_col = start_col - 1
+        block = _CellBlock(start_row, start_col, exhibit.nrows, formats,
+                           values, writers, blanks)
+        block.ordered = True
+        return block
+
+
+class _ChunkReader:
+    """ Reads row ranges front to back from an iterator of DataFrame chunks,
+    holding no more than the chunk being read.  The chunks of deferred data
+    come from calling its factory when the first rows are read.
+    """
+
+    def __init__(self, chunks, nrows, schema):
+        self.chunks = chunks
+        self.nrows = nrows
+        self.schema = schema
+        self.source = None
+        self.buffer = None
+        self.offset = 0
+
+    def _next(self):
+        if self.buffer is not None:
+            self.offset += len(self.buffer)
+        self.buffer = next(self.source, None)
+
+    def read(self, start, stop):
+        if self.source is None and self.chunks['factory'] is not None:
+            data = self.chunks['factory']()
+            if type(data) is pd.DataFrame:
+                data = [data]
+            self.source = iter(data)
+            self._next()
+        if self.source is None:
+            if self.chunks['consumed']:
+                raise ValueError('Chunked data can only be rendered once')
+            self.chunks['consumed'] = True
+            head = self.chunks['head']
+            self.source = iter(self.chunks['source'])
+            if head is not None:
+                self.source = chain([head], self.source)
+            self._next()
+        if start < self.offset:
+            raise ValueError('Chunked data must be read in order')
+        frames = []
+        while start < stop and self.buffer is not None:
+            if start >= self.offset + len(self.buffer):
+                self._next()
+                continue
+            frame = self.buffer.iloc[start - self.offset:stop - self.offset]
+            frames.append(frame)
+            start += len(frame)
+        if stop >= self.nrows:
+            while self.buffer is not None and \
+                    self.offset + len(self.buffer) <= self.nrows:
+                self._next()
+            if self.buffer is not None:
+                raise ValueError(
+                    'Chunked data holds more than nrows={} rows'.format(
+                        self.nrows))
+        if not frames:
+            return self.schema
+        return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+
+def _column_formats(blocks):
+    """ Finds the sheet columns whose data cells share one format, which
+    does not show on empty cells, and that hold no other cells without a
+    format.  Returns the format of each such column.
+    """
+    found, mixed = {}, set()
+    for block in blocks:
+        klass = block.__class__.__name__
+        if klass == '_CellBlock' and block.writers is not None:
+            for col, fmt in enumerate(block.formats, block.col):
+                if found.setdefault(col, fmt) is not fmt or fmt is None or \
+                        _visible_when_blank(fmt):
+                    mixed.add(col)
+        elif klass == '_CellBlock':
+            mixed.update(col for col, fmt in enumerate(block.formats, block.col)
+                         if fmt is None)
+        elif klass in ['_MergeBlock', '_TableBlock']:
+            if getattr(block, 'fmt', None) is None:
+                mixed.update(range(block.col, block.last_col + 1))
+    return {col: fmt for col, fmt in found.items() if col not in mixed}
+
+
+def _visible_when_blank(fmt):
+    """ Whether a format shows on an empty cell, i.e. has borders or a fill """
+    return fmt is not None and bool(
+        fmt.pattern or fmt.bg_color is not None or fmt.fg_color is not None
+        or fmt.top or fmt.bottom or fmt.left or fmt.right or fmt.diag_type)
+
+
+def _column_writer(column):
+    """ Picks the xlsxwriter method that writes a column.  Numbers, dates
+    and booleans in numpy dtypes are written directly, columns holding only
+    strings skip the formula and url sniffing of `write`, and anything else
+    goes through `write`.  The methods behind the public ones are used, as
+    `write_column` does, to skip their cell reference conversion.
+    """
+    column = _arrow_categorical(column)
+    dtype = column.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Categoricals are written like their categories
+        return _column_writer(pd.Series(dtype.categories))
+    if isinstance(dtype, pd.ArrowDtype) and not _zoned(dtype):
+        dtype = dtype.numpy_dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'fiuM':
+        return '_write_number'
+    if isinstance(dtype, np.dtype) and dtype.kind == 'b':
+        return '_write_boolean'
+    if pd.api.types.infer_dtype(column, skipna=True) in ['string', 'empty']:
+        return '_write_string'
+    return '_write'
+
+
+def _column_values(column, writer, encode=False):
+    """ The values of a column as python scalars with None where missing.
+    Dates become Excel serial numbers.  String columns that are categorical,
+    or `encode`d, come back as `_Encoded` values.
+    """
+    column = _arrow_categorical(column)
+    if writer == '_write_string' and (
+            encode or isinstance(column.dtype, pd.CategoricalDtype)):
+        return _Encoded(column)
+    nulls = None
+    if isinstance(column.dtype, pd.ArrowDtype) and not _zoned(column.dtype):
+        # Read from the Arrow buffers with missing values taken from the
+        # validity bitmap rather than through pandas scalars
+        nulls = column.isna().to_numpy()
+        dtype = column.dtype.numpy_dtype
+        if dtype.kind == 'M':
+            # Arrow dates cannot be filled with a datetime, but cast to one
+            # they come back with NaT where missing
+            array = column.astype(dtype).to_numpy()
+        else:
+            array = column.to_numpy(dtype, na_value=np.zeros((), dtype)[()]
+                                    if dtype.kind in 'fiub' else None)
+    else:
+        array = column.to_numpy()
+    if array.dtype.kind == 'M':
+        mask = np.isnat(array)
+        array = _excel_serials(array)
+    elif array.dtype.kind == 'f':
+        mask = np.isnan(array)
+    elif array.dtype.kind in 'iub':
+        mask = None
+    else:
+        mask = column.isna().to_numpy()
+        if writer == '_write_string':
+            # Empty strings are blanks, not empty string cells
+            mask = mask | column.eq('').fillna(False).to_numpy(bool)
+    if nulls is not None and nulls.any():
+        mask = nulls if mask is None else mask | nulls
+    values = array.tolist()
+    if mask is not None:
+        for num in np.flatnonzero(mask):
+            values[num] = None
+    return values
+
+
+def _arrow_categorical(column):
+    """ An Arrow dictionary column as the categorical of the same indices
+    and dictionary, so that it is written like one.  Other columns are
+    returned as they are.
+    """
+    if isinstance(column.dtype, pd.ArrowDtype) and \
+            hasattr(column.dtype.pyarrow_dtype, 'index_type'):
+        return column.array.__arrow_array__().to_pandas().set_axis(
+            column.index)
+    return column
+
+
+class _Encoded(list):
+    """ The values of a dictionary encoded string column, with None where
+    missing.  `codes` holds the position of each value in `categories`, or
+    -1 where missing, so that each category is handled once rather than per
+    cell.  Columns that are not categorical are encoded in order of first
+    appearance.
+    """
+
+    def __init__(self, column):
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            categories = column.cat.categories.to_numpy(object)
+        else:
+            codes, categories = pd.factorize(column)
+            categories = np.asarray(categories, dtype=object)
+        # Empty strings are blanks, not empty string cells
+        codes = np.where(np.append(categories == '', False)[codes], -1, codes)
+        super().__init__(np.append(categories, None)[codes].tolist())
+        self.codes = codes
+        self.categories = categories
+
+
+def _base_format(base_formats, dtype):
+    """ The entry of `base_formats` for a column of `dtype`.  Arrow types are
+    looked up by the numpy dtype they convert to and datetimes by any unit.
+    """
+    if isinstance(dtype, pd.ArrowDtype) and not _zoned(dtype):
+        dtype = dtype.numpy_dtype
+    if isinstance(dtype, np.dtype) and dtype.kind == 'M':
+        dtype = 'datetime64[ns]'
+    return base_formats.get(str(dtype), base_formats['object'])
+
+
+def _zoned(dtype):
+    """ Whether `dtype` is an Arrow timestamp with a time zone, which Excel
+    does not support and is written like pandas writes zoned datetimes.
+    """
+    return getattr(dtype.pyarrow_dtype, 'tz', None) is not None
+
+
+def _excel_serials(array):
+    """ Excel serial numbers of datetime64 values, computed as xlsxwriter
+    computes them for datetime objects.
+    """
+    micros = (array.astype('datetime64[us]') -
+              np.datetime64('1899-12-31', 'us')).astype(np.int64)
+    days, micros = np.divmod(micros, 86400000000)
+    seconds, micros = np.divmod(micros, 1000000)
+    serials = days + (seconds.astype(float) + micros / 1e6) / 86400
+    # 1900-01-01 is day one rather than two, and Excel treats 1900 as a
+    # leap year
+    serials[days == 1] -= 1
+    serials[serials > 59] += 1
+    return serials
+
+
+def _arrow_frame(data):
+    """ Wraps an Arrow table, or a frame that converts to one such as a
+    polars DataFrame, as a pandas DataFrame of `ArrowDtype` columns.  The
+    columns share the Arrow buffers rather than copying them into numpy.
+    """
+    if hasattr(data, 'to_arrow'):
+        data = data.to_arrow()
+    # pandas has no kernels for the view types, so read them as plain ones
+    import pyarrow as pa
+    views = {'string_view': pa.large_string(), 'binary_view': pa.large_binary()}
+    if any(str(field.type) in views for field in data.schema):
+        data = data.cast(pa.schema([
+            field.with_type(views.get(str(field.type), field.type))
+            for field in data.schema]))
+    return data.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+@functools.lru_cache(maxsize=None)
+def _available_formats():
+    """ Names of the format properties supported by xlsxwriter """
+    return frozenset([item[4:] for item in dir(xlsxwriter.format.Format)
+                      if item[:3]=='set'])
+
+
+def _render_sheet(job):
+    """ Renders a sheet for `_Workbook._write_parts`.  Returns the
+    worksheet part of the sheet, or None if the part refers to other parts of
+    the package, along with the RenderStats of the sheet if requested.
+    """
+    (sheet, position, properties, default_formats, instrument,
+     column_formats) = job
+    stats = RenderStats() if instrument else None
+    workbook = _Workbook(BytesIO(), None, default_formats,
+                         constant_memory=True, stats=stats,
+                         column_formats=column_formats)
+    if position:
+        # Only the first sheet of a workbook is selected
+        workbook._create_sheet('Sheet1' if sheet.name != 'Sheet1' else 'Sheet2')
+    workbook.formats.freeze(properties)
+    start = workbook.stats.start()
+    workbook._stream(sheet)
+    workbook.stats.stop('sheets', sheet.name, start)
+    workbook.writer.close()
+    package = zipfile.ZipFile(workbook.target)
+    number = 2 if position else 1
+    rels = 'xl/worksheets/_rels/sheet{}.xml.rels'.format(number)
+    if rels in package.namelist():
+        return None, stats
+    return package.read('xl/worksheets/sheet{}.xml'.format(number)), stats
+
+
+def _fingerprint(sheet, options, properties):
+    """ Hashes everything the worksheet part of a sheet depends on: its
+    layout, data, settings, render `options` and the format table of the
+    workbook, which fixes the format indices in the part.  Returns None when
+    the data of the sheet cannot be hashed.
+    """
+    digest = hashlib.sha1(repr((
+        __version__, xlsxwriter.__version__, settings, properties, options,
+        sorted(sheet.kwargs.items()), sheet.column_widths,
+        sheet.row_heights)).encode())
+    for leaf, row, col in sheet.leaves:
+        state = sorted((k, v) for k, v in vars(leaf).items()
+                       if k not in ['data', '_inferred', '_measured'])
+        digest.update(repr((leaf.__class__.__name__, row, col, state)).encode())
+        data = leaf.data
+        try:
+            digest.update(repr((
+                list(data.columns), data.index.names,
+                list(data.dtypes))).encode())
+            digest.update(pd.util.hash_pandas_object(data).values.tobytes())
+            # Object values are hashed by their text, which does not tell 1
+            # from '1', so hash the types of the values as well
+            for frame in [data.index.to_frame(index=False), data]:
+                for num in range(frame.shape[1]):
+                    values = frame.iloc[:, num]
+                    if isinstance(values.dtype, pd.CategoricalDtype):
+                        values = values.cat.categories.to_series()
+                    if values.dtype == object:
+                        digest.update(pd.util.hash_pandas_object(
+                            values.map(type).astype(str),
+                            index=False).values.tobytes())
+        except (AttributeError, TypeError):
+            return None
+    return digest.hexdigest()
+
+
+def _read_part(cache_dir, fingerprint):
+    try:
+        with open(os.path.join(cache_dir, fingerprint + '.xml'), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_part(cache_dir, fingerprint, part):
+    """ Stores a worksheet part, replacing the file atomically so concurrent
+    renders never read a partial part.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, fingerprint + '.xml')
+    with open(path + '.' + str(os.getpid()), 'wb') as f:
+        f.write(part)
+    os.replace(path + '.' + str(os.getpid()), path)
+
+
+def _splice(source, target, parts):
+    """ Copies the xlsx package in `source` to `target` replacing the contents
+    of the named `parts`.
+    """
+    source.seek(0)
+    with zipfile.ZipFile(source) as package, \
+            zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as spliced:
+        for info in package.infolist():
+            spliced.writestr(
+                info, parts.get(info.filename) or package.read(info.filename))
 
 
 class _XLCBase:
     px_per_row = 15
     with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'styles.css'), 'r') as f:
         styles = '<style>' + f.read() + '</style>'
-
-    def to_excel(self, workbook_path, default_formats=None):
+    # The attributes containers are measured from.  Setting any of them on
+    # an object that has been measured as part of a container starts a new
+    # layout generation, which invalidates the cached geometry of every
+    # container holding it, however deeply.  Objects being set up have not
+    # been measured yet and leave the caches alone.
+    _layout_attrs = frozenset([
+        'args', 'data', 'height', 'width', 'header', 'index', 'col_nums',
+        'nrows', 'title', '_row_heights', '_column_widths'])
+    _generation = 0
+
+    def __setattr__(self, name, value):
+        if name in self._layout_attrs and self.__dict__.get('_measured'):
+            _XLCBase._generation += 1
+        object.__setattr__(self, name, value)
+
+    def to_excel(self, workbook_path, default_formats=None,
+                 constant_memory=False, workers=None, stats=False, hooks=None,
+                 cache_dir=None, column_formats=False, backend='xlsxwriter'):
         """ Outputs object to Excel.
 
         Parameters:
         -----------
-        workbook_path : str
-            The target path and filename of the Excel document
+        workbook_path : str or file-like
+            The target path and filename of the Excel document or a writable
+            binary stream such as a BytesIO, socket file or response body.
+            Streams need not be seekable.  The package is assembled in memory
+            and written to the stream without temporary files, unless
+            `constant_memory` is set, in which case sheet rows are still
+            buffered in temporary files to keep memory bounded.
+        default_formats : dict
+            xlsxwriter formats applied underneath every format of the workbook
+        constant_memory : bool
+            Use xlsxwriter's `constant_memory` mode. Each sheet is streamed to
+            disk in row order across all of its exhibits so memory stays
+            bounded by a row rather than the sheet.  Strings are written
+            inline and images do not merge the cells behind them.
+        workers : int
+            Render sheets in a pool of this many processes.  This implies
+            `constant_memory` and the workbook matches one rendered with
+            `constant_memory=True` part for part.
+        cache_dir : str
+            Directory of a cache of rendered worksheet parts.  Each sheet is
+            fingerprinted by its layout, data, settings and the format table
+            of the workbook, and sheets that are unchanged since a previous
+            render are spliced in from the cache rather than rendered again.
+            This implies `constant_memory`.  Files are named by fingerprint
+            and the directory may be cleared at any time.
+        column_formats : bool
+            Set the format of a DataFrame column once on the sheet column
+            when its data is the only content of that sheet column needing a
+            format, rather than on each cell.  Missing values in such columns
+            are not written at all.  Formats with borders or fills, and
+            sheet columns shared by exhibits with different formats, stay on
+            the cells.
+        backend : str or callable
+            How blocks of cells are written.  'xlsxwriter' writes each cell
+            through the worksheet methods of xlsxwriter.  'table' stores the
+            typed data columns of DataFrames straight into the cell table of
+            the worksheet, which is faster for data heavy sheets and gives
+            the same workbook.  A callable is called as
+            ``backend(block, worksheet)`` for each block.  Rows are streamed
+            by xlsxwriter in `constant_memory` mode and the backend is not
+            used then.  'table' is not offered by xlsxwriter releases whose
+            worksheet internals it does not recognize.
+        stats : bool
+            Instrument the render and return its RenderStats.
+        hooks : list
+            Callables invoked as ``hook(kind, name, seconds)`` as each phase
+            or sheet of the render finishes.  Implies `stats`.
+
+        Returns
+        -------
+            RenderStats when `stats` or `hooks` is set, otherwise None
+        """
+        return _Workbook(
+            workbook_path=workbook_path, exhibits=self,
+            default_formats=default_formats, constant_memory=constant_memory,
+            workers=workers,
+            stats=RenderStats(hooks or ()) if stats or hooks else None,
+            cache_dir=cache_dir, column_formats=column_formats,
+            backend=backend).to_excel()
+
+    def to_bytes(self, default_formats=None, **kwargs):
+        """ Renders the object to the contents of an xlsx file.  The whole
+        package is held in memory.  Keyword arguments are passed on to
+        `to_excel`, see it for the parameters.
         """
-        _Workbook(workbook_path=workbook_path, exhibits=self,
-                  default_formats=default_formats).to_excel()
+        buffer = BytesIO()
+        self.to_excel(buffer, default_formats=default_formats, **kwargs)
+        return buffer.getvalue()
 
     def _repr_html_(self):
         return self.styles + self._get_html()
 
+    def _clone(self):
+        """ Copies the layout node.  The data and contents of the node are
+        shared by reference so that nesting an object in containers does not
+        duplicate it.  Containers only ever adjust the geometry of their
+        direct children, so each container holds its own copies of those.
+        """
+        return copy.copy(self)
+
 
     def _get_html(self, my_height=0, my_width=100):
         width = 'width:' + str(my_width) + '%;' if my_width < 100 else 'width: auto;'
         name = self.__class__.__name__
+        body = self._preview_html()
+        height = 'min-height:' if body else 'height:'
         return '<div class="xlccontainer-' + name + \
-                '" style="height:' + str(self.height*self.px_per_row) + 'px;' + \
-                width + '"><div class="xlclabel-' + \
+                '" style="' + height + str(self.height*self.px_per_row) + \
+                'px;' + width + '"><div class="xlclabel-' + \
                 name + '">' + name + \
-                '</div></div>\n'
+                '</div>' + body + '</div>\n'
+
+    def _preview_html(self):
+        return ''
 
 
 class Title(_XLCBase):
@@ -345,6 +1629,8 @@ class Title(_XLCBase):
         list of floats representing the row heights of each row within the
         Series.  If omitted, then heights are set by inspecting the data.
     """
+    # Titles take the width of their container, which does not measure it
+    _layout_attrs = _XLCBase._layout_attrs - {'width'}
 
     def __init__(self, data, formats=[], width=None,
                  column_widths=None, row_heights=None, *args, **kwargs):
@@ -424,6 +1710,7 @@ class Series(Title):
         list of floats representing the row heights of each row within the
         Series.  If omitted, then heights are set by inspecting the data.
     """
+    _layout_attrs = _XLCBase._layout_attrs
 
     def __init__(self, data, formats=None, width=1, column_widths=1,
                  row_heights=None, *args, **kwargs):
@@ -486,8 +1773,11 @@ class DataFrame(_XLCBase):
     Parameters:
     -----------
     data : DataFrame
-        The data to be placed in the exhibit. Must be a pandas DataFrame or an
-        object with the `to_frame()` method.
+        The data to be placed in the exhibit. Must be a pandas DataFrame, an
+        object with the `to_frame()` method, or an Arrow table or polars
+        DataFrame, whose columns are written from their Arrow buffers.  With
+        `schema`, it may also be an iterator of DataFrame chunks or a
+        callable returning the data.
     formats : dict
         The formats to be applied to the data columns.  Dictionary keys can be
         either column names to do column specific formatting OR `xlsxwriter`
@@ -511,6 +1801,50 @@ class DataFrame(_XLCBase):
     row_heights : list
         list of floats representing the row heights of each row within the
         DataFrame.  If omitted, then heights are set by inspecting the data.
+    sparse : bool
+        Set to True to leave missing values out of the workbook rather than
+        writing them as formatted blank cells.  Blanks are still written where
+        the column format has borders or a fill so that the exhibit looks the
+        same.  Useful for triangles and other mostly empty data.
+    overflow : str
+        Set to 'split' to continue data beyond the row or column limits of
+        Excel on further sheets.  See `Sheet`.
+    schema : DataFrame
+        Set when `data` is an iterator of DataFrame chunks, such as
+        ``pd.read_csv(..., chunksize=n)``.  The columns and dtypes of the
+        schema describe the chunks and lay out the exhibit.  Chunks are
+        consumed as cells are written so memory is bounded by the chunk size,
+        and the exhibit can be rendered only once.  Column widths are sized
+        from the first chunk.
+
+        Set along with a callable `data` to defer the data until the exhibit
+        is written.  The callable takes no arguments and returns a DataFrame
+        or an iterator of chunks laid out like the schema.  It is called each
+        time the exhibit is written and the data is released once its cells
+        are, so layouts of many exhibits only ever hold the data of one.
+        Unless `column_widths` are given, the callable is also called once to
+        size columns from its first chunk.  A dict mapping column names
+        to dtypes may be given instead of an empty DataFrame.
+    nrows : int
+        The number of rows of a chunked or deferred `data`, required with
+        `schema`.  If the data runs out early the remaining rows are left
+        blank, more rows than this raise a ValueError.
+    table : bool
+        Set to True to write the exhibit as a native Excel table with
+        filtering.  The index, if any, becomes the first column of the table,
+        the table style replaces the header formats and `formats` still
+        apply to the data cells.  Tables are not available with `col_nums`
+        and rendering them with `constant_memory`, `workers` or `cache_dir`
+        raises a ValueError.
+    table_style : str
+        The Excel table style, such as 'Table Style Light 9'.  Defaults to
+        the xlsxwriter default style.
+    dictionary_encode : bool
+        Set to True to encode string columns as categoricals are before they
+        are written, so that each distinct string is added to the shared
+        strings of the workbook once rather than per cell when rendering
+        with ``backend='table'``.  Useful for long columns of few distinct
+        strings.  Categorical columns are always written this way.
     """
 
     index_formats = copy.deepcopy(settings['index_formats'])
@@ -520,21 +1854,45 @@ class DataFrame(_XLCBase):
     def __init__(self, data, formats=None,
                  header=True, header_formats=None, col_nums=False,
                  index=True, index_label='', index_formats=None,
-                 column_widths=None, row_heights=None, *args, **kwargs):
-
-        if type(data) is not pd.DataFrame:
-            data = data.to_frame()
+                 column_widths=None, row_heights=None, sparse=False,
+                 schema=None, nrows=None, table=False, table_style=None,
+                 dictionary_encode=False, *args, **kwargs):
+
+        self.chunks = None
+        if schema is not None:
+            if nrows is None:
+                raise ValueError('nrows is required for chunked or deferred data')
+            if type(schema) is dict:
+                schema = pd.DataFrame({column: pd.Series(dtype=dtype)
+                                       for column, dtype in schema.items()})
+            # Shared by every copy of the exhibit in a layout
+            self.chunks = {'source': None if callable(data) else iter(data),
+                           'factory': data if callable(data) else None,
+                           'head': None, 'consumed': False}
+            data = schema.iloc[:0]
+        elif type(data) is not pd.DataFrame:
+            if hasattr(data, 'to_arrow') or hasattr(data, 'to_pandas'):
+                data = _arrow_frame(data)
+            else:
+                data = data.to_frame()
         self.data = data
+        self.nrows = len(data) if nrows is None else nrows
+        self.sparse = sparse
+        self.dictionary_encode = dictionary_encode
+        if table and col_nums:
+            raise ValueError('Tables do not support col_nums')
+        self.table = table
+        self.table_style = table_style
         self.header = header
         self.index = index
         self.index_label = index_label
         self.col_nums = col_nums
         self._format_validation(formats)
-        if column_widths is None:
-            self.column_widths = self._get_column_widths()
-        else:
+        # Inferred widths are shared by every copy of the exhibit in a layout
+        self._inferred = {}
+        if column_widths is not None:
             self.column_widths = column_widths
-        self.height = data.shape[0] + self.col_nums + self.header
+        self.height = self.nrows + self.col_nums + self.header
         self.width = data.shape[1] + self.index
         if header_formats is not None:
             self.header_formats.update(header_formats)
@@ -544,32 +1902,118 @@ class DataFrame(_XLCBase):
             self._row_heights = row_heights
         self.kwargs = kwargs
 
+    @property
+    def column_widths(self):
+        """ Widths of the columns of the exhibit.  Unless set explicitly, these
+        are inferred from the data the first time they are needed, which is
+        when the layout is rendered.
+        """
+        if hasattr(self, '_column_widths'):
+            return self._column_widths
+        if 'column_widths' not in self._inferred:
+            self._inferred['column_widths'] = self._get_column_widths()
+        return self._inferred['column_widths']
+
+    @column_widths.setter
+    def column_widths(self, value):
+        self._column_widths = value
+
+    def _preview_html(self):
+        """ A table of the first and last rows of the data as configured by
+        `html_preview` in settings.  Only those rows are formatted and the
+        table is shared by every copy of the exhibit in a layout.
+        """
+        preview = settings['html_preview']
+        if not preview['rows']:
+            return ''
+        key = ('html', preview['rows'], preview['cols'])
+        if key not in self._inferred:
+            data = self.data if self.chunks is None else self._head()
+            table = data.to_html(
+                max_rows=preview['rows'] * 2, max_cols=preview['cols'],
+                index=bool(self.index), header=bool(self.header),
+                show_dimensions=False, border=0)
+            if len(data) < self.nrows:
+                table += '<div>{} rows</div>'.format(self.nrows)
+            self._inferred[key] = table
+        return self._inferred[key]
+
     def _get_column_widths(self):
         """ Default column widths """
+        data = self.data if self.chunks is None else self._head()
         if self.index:
-            row_w = [max(self.data.index.astype(str).str.len())]
+            row_w = [self._text_width(data.index)]
             header_w = [max([len(token)
                              for token in str(self.index_label).split(' ')])]
         else:
             row_w = []
             header_w = []
-        headers = list(self.data.columns)
+        headers = list(data.columns)
         header_w = header_w + \
                    [max([len(token) for token in str(item).split(' ')])
                     for item in headers]
-        numeric_cols = self.data.select_dtypes('number').columns
+        numeric_cols = data.select_dtypes('number').columns
         row_w = row_w + \
                 [(settings['min_numeric_col_width'] if item in numeric_cols
-                 else max(self.data[item].astype(str).str.len()))
-                 for item in headers]
+                 else self._text_width(data.iloc[:, num]))
+                 for num, item in enumerate(headers)]
         return [max(item)* settings['col_padding_multiplier']
                 for item in zip(header_w, row_w)]
 
+    def _head(self):
+        """ The first chunk of chunked data, read ahead to size columns """
+        if self.chunks['factory'] is not None:
+            # Deferred data is loaded for this and released again
+            data = self.chunks['factory']()
+            if type(data) is pd.DataFrame:
+                return data
+            return next(iter(data), self.data)
+        if self.chunks['head'] is None:
+            self.chunks['head'] = next(self.chunks['source'], self.data)
+        return self.chunks['head']
+
+    @staticmethod
+    def _text_width(values):
+        """ Length in characters of the text representation of a Series or
+        Index.  Rows are sampled as configured by `column_width_sample` in
+        settings and the chosen quantile of their lengths is returned.
+        """
+        sample = settings['column_width_sample']
+        rows = sample['rows']
+        if len(values) > rows and sample['strategy'] != 'all':
+            if sample['strategy'] == 'head':
+                positions = np.arange(rows)
+            elif sample['strategy'] == 'tail':
+                positions = np.arange(len(values) - rows, len(values))
+            elif sample['strategy'] == 'head_tail':
+                positions = np.r_[np.arange(rows // 2),
+                                  np.arange(len(values) - rows + rows // 2,
+                                            len(values))]
+            elif sample['strategy'] == 'random':
+                positions = np.sort(np.random.default_rng(0).choice(
+                    len(values), rows, replace=False))
+            else:
+                raise ValueError(
+                    'Unknown column_width_sample strategy ' +
+                    str(sample['strategy']))
+            values = values.take(positions)
+        if len(values) == 0:
+            return 0
+        # Measured one value at a time as a fixed width array of the text
+        # takes the longest value's width for every row
+        lengths = np.fromiter(map(len, map(str, values.astype(str))),
+                              dtype=np.int64, count=len(values))
+        if sample['quantile'] >= 1:
+            return int(lengths.max())
+        lengths.sort()
+        return int(
+            lengths[int(np.ceil(sample['quantile'] * (len(lengths) - 1)))])
+
     @property
     def row_heights(self):
         if hasattr(self, '_row_heights'):
             return self._row_heights
-        return [None]*(len(self.data) + (1 - (not self.header)) + self.col_nums)
+        return [None]*(self.nrows + (1 - (not self.header)) + self.col_nums)
 
     @row_heights.setter
     def row_heights(self, value):
@@ -589,7 +2033,7 @@ class DataFrame(_XLCBase):
             idx = pd.Series(dtype='object')
         cols = pd.concat((self.data.dtypes, idx), axis=0)
         self.formats = {
-            k: self.base_formats.get(v, self.base_formats['object'])
+            k: _base_format(self.base_formats, v)
             for k, v in dict(zip(cols.index, cols.values)).items()}
         if type(formats) is list:
             self.formats.update(dict(zip(self.data.columns, formats)))
@@ -598,14 +2042,12 @@ class DataFrame(_XLCBase):
                 self.data.columns,
                 [{'num_format': formats}] * len(self.data.columns))))
         elif type(formats) is dict and formats != {}:
-            available_formats = [
-                item[4:] for item in dir(xlsxwriter.format.Format)
-                if item[:3]=='set']
+            available_formats = _available_formats()
             if len(set(self.data.columns).intersection(formats.keys()))==0:
                 self.formats.update(dict(zip(
                     self.data.columns,
                     [formats] * len(self.data.columns))))
-            elif len(set(available_formats).intersection(formats.keys()))==0:
+            elif len(available_formats.intersection(formats.keys()))==0:
                 formats = {k: v if type(v) is dict else {'num_format': v}
                            for k, v in formats.items()}
                 self.formats.update(formats)
@@ -671,7 +2113,7 @@ class _Container(_XLCBase):
     """ Base class for Row and Column """
 
     def __init__(self, *args, **kwargs):
-        self.args = tuple([copy.deepcopy(item) for item in args])
+        self.args = tuple([item._clone() for item in args])
         self._title_len = 0
         for item in self.args:
             if item.__class__.__name__ in ['Title']:
@@ -685,6 +2127,37 @@ class _Container(_XLCBase):
     def __len__(self):
         return len(self.args)
 
+    @property
+    def height(self):
+        return _measure(self).height
+
+    @property
+    def width(self):
+        return _measure(self).width
+
+    @property
+    def column_widths(self):
+        return _measure_widths(self)
+
+    @column_widths.setter
+    def column_widths(self, value):
+        self._column_widths = value
+
+    @property
+    def row_heights(self):
+        return _measure(self).row_heights
+
+    @row_heights.setter
+    def row_heights(self, value):
+        self._row_heights = value
+
+    def _get_html(self, my_height=100, my_width=100):
+        width = 'width:' + str(my_width) + '%;' if my_width < 100 else 'width: auto;'
+        return '<div class="xlccontainer-Container" style="' + \
+                self._style.format(width) + \
+                '"><div class="xlclabel-Container">' + \
+                self.__class__.__name__ + '</div>' + _html(self) + '</div>\n'
+
 
 class Row(_Container):
     """
@@ -704,54 +2177,37 @@ class Row(_Container):
         Width of the container and is a function of the elements it contains
 
     """
+    _style = '{}'
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         for num, item in enumerate(self.args):
             if item.__class__.__name__ in ['Title']:
                 self.args = Column(item, Row(*self.args[num + 1:]))
+        self._geometry = self._widths = self._html = None
 
-    @property
-    def height(self):
-        return max([item.height for item in self.args])
-
-    @property
-    def width(self):
-        return sum([item.width for item in self.args
-                    if item.__class__.__name__ not in ['Title']])
-
-    @property
-    def column_widths(self):
+    def _combine(self, items):
+        """ Geometry of the Row given (item, geometry) of its contents """
+        height = max([geo.height for item, geo in items])
+        width = sum([geo.width for item, geo in items
+                     if item.__class__.__name__ not in ['Title']])
+        if hasattr(self, '_row_heights'):
+            row_heights = self._row_heights
+        else:
+            row_heights = [
+                max([item or 0 for item in heights]) or None
+                for heights in zip_longest(
+                    *[geo.row_heights for item, geo in items
+                      if item.__class__.__name__ not in ['Title', 'Image']])]
+        return _Geometry(height, width, row_heights)
+
+    def _combine_widths(self, items):
+        """ Column widths of the Row given (item, widths) of its contents """
         if hasattr(self, '_column_widths'):
             return self._column_widths
-        column_widths = []
-        for item in [getattr(item, 'column_widths', []) for item in self.args]:
-            column_widths = column_widths + item
-        return column_widths
-
-    @column_widths.setter
-    def column_widths(self, value):
-        self._column_widths = value
-
-    @property
-    def row_heights(self):
-        if hasattr(self, '_row_heights'):
-            return self._row_heights
-        data = np.array(
-            [item.row_heights for item in self.args
-             if item.__class__.__name__ not in ['Title', 'Image']])
-        lens = np.array([len(i) for i in data])
-        mask = np.arange(lens.max()) < lens[:,None]
-        out = np.zeros(mask.shape, dtype=data.dtype)
-        out[mask] = np.concatenate(data)
-        out[out==None]=0
-        return [item if item!=0 else None for item in np.max(out, axis=0)]
-
-    @row_heights.setter
-    def row_heights(self, value):
-        self._row_heights = value
+        return [width for item, widths in items for width in widths]
 
-    def _get_html(self, my_height=100, my_width=100):
-        direction = ''
+    def _contents_html(self):
         widths = [item.width/self.width*100 for item in self.args]
         heights = [item.height for item in self.args]
         contents = []
@@ -760,9 +2216,7 @@ class Row(_Container):
                 contents.append(self.args[num]._get_html(max(heights), widths[num]))
             else:
                 contents.append(self.args[num]._get_html(heights[num], widths[num]))
-        contents = ''.join(contents)
-        width = 'width:' + str(my_width) + '%;' if my_width < 100 else 'width: auto;'
-        return '<div class="xlccontainer-Container" style="' + width + '"><div class="xlclabel-Container">Row</div>' + contents + '</div>\n'
+        return ''.join(contents)
 
 
 class Column(_Container):
@@ -783,64 +2237,37 @@ class Column(_Container):
         Width of the container and is a function of the elements it contains
 
     """
+    _style = 'flex-direction: column;{};'
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        for item in self.args:
-            if item.__class__.__name__ not in ['Title']:
-                item.column_widths = self.column_widths
+        self._geometry = self._html = None
 
-    @property
-    def height(self):
-        return sum([item.height for item in self.args])
-
-    @property
-    def width(self):
-        return max([item.width for item in self.args
-                    if item.__class__.__name__ not in ['Title']])
+    def _combine(self, items):
+        """ Geometry of the Column given (item, geometry) of its contents """
+        height = sum([geo.height for item, geo in items])
+        width = max([geo.width for item, geo in items
+                     if item.__class__.__name__ not in ['Title']])
+        if hasattr(self, '_row_heights'):
+            row_heights = self._row_heights
+        else:
+            row_heights = [
+                height for item, geo in items
+                for height in getattr(geo, 'row_heights', [])]
+        return _Geometry(height, width, row_heights)
 
-    @property
-    def column_widths(self):
+    def _combine_widths(self, items):
+        """ Column widths of the Column given (item, widths) of its contents """
         if hasattr(self, '_column_widths'):
             return self._column_widths
-        data = np.array(
-            [item.column_widths for item in self.args
-             if item.__class__.__name__ not in ['Title']],
-             dtype='object')
-        lens = np.array([len(i) for i in data])
-        mask = np.arange(lens.max()) < lens[:,None]
-        out = np.zeros(mask.shape, dtype=data.dtype)
-        out[mask] = np.concatenate(data)
-        return list(np.max(out, axis=0))
+        return [max(widths) for widths in zip_longest(
+            *[widths for item, widths in items
+              if item.__class__.__name__ not in ['Title']], fillvalue=0)]
 
-    @column_widths.setter
-    def column_widths(self, value):
-        self._column_widths = value
-
-    @property
-    def row_heights(self):
-        if hasattr(self, '_row_heights'):
-            return self._row_heights
-        row_heights = []
-        for item in [getattr(item, 'row_heights', []) for item in self.args]:
-            row_heights = row_heights + item
-        return row_heights
-
-    @row_heights.setter
-    def row_heights(self, value):
-        self._row_heights = value
-
-    def _get_html(self, my_height=100, my_width=100):
-        direction = ''
+    def _contents_html(self):
         widths = [item.width/self.width*100 for item in self.args]
-        heights = [100]*len(widths)
-        contents = []
-        for num in range(len(self.args)):
-            contents.append(self.args[num]._get_html(heights[num], widths[num]))
-        contents = ''.join(contents)
-        width = 'width:' + str(my_width) + '%;' if my_width < 100 else 'width: auto;'
-        return '<div class="xlccontainer-Container" style="flex-direction: column;' + \
-                width + ';"><div class="xlclabel-Container">Column</div>' + \
-                contents + '</div>\n'
+        return ''.join([item._get_html(100, width)
+                        for item, width in zip(self.args, widths)])
 
 class Tabs(_XLCBase):
     """
@@ -856,9 +2283,9 @@ class Tabs(_XLCBase):
 
     def __init__(self, *args, **kwargs):
         self.args = [
-            Sheet(item[0], copy.deepcopy(item[1]))
+            Sheet(item[0], item[1]._clone())
             if type(item) is tuple
-            else copy.deepcopy(item)
+            else item._clone()
             for item in args]
         self.kwargs = kwargs
 
@@ -923,6 +2350,11 @@ class Sheet(_XLCBase):
         refer to `xlsxwriter` for `set_landscape` options
     set_portrait:
         refer to `xlsxwriter` for `set_portrait` options
+    overflow:
+        Set to 'split' to continue a DataFrame too big for one worksheet on
+        further sheets named 'name (2)', 'name (3)' and so on, each with the
+        header repeated.  Otherwise rendering such a sheet raises a
+        ValueError before anything is written.
     """
     def __init__(self, name, layout, **kwargs):
         self.name = name
@@ -932,8 +2364,14 @@ class Sheet(_XLCBase):
         else:
             self.layout = layout
         self.kwargs = kwargs
-        self.column_widths = self.layout.column_widths
-        self.row_heights = self.layout.row_heights
+
+    @property
+    def column_widths(self):
+        return self.layout.column_widths
+
+    @property
+    def row_heights(self):
+        return self.layout.row_heights
 
     def _repr_html_(self):
         return self.layout._repr_html_()
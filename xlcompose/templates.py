@@ -1,11 +1,16 @@
 import yaml
 import json
-import pandas as pd
 import re
-import ast
+import copy
+import functools
 import os
+import time
+import traceback
 import xlcompose.core as core
-from jinja2 import nodes, Template, TemplateSyntaxError, FileSystemLoader, Environment, BaseLoader
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from jinja2 import nodes, Template, TemplateSyntaxError, TemplateNotFound, FileSystemLoader, Environment, BaseLoader
 from jinja2.ext import Extension
 from jinja2.nodes import Const
 
@@ -28,18 +33,16 @@ class EvalExtension(Extension):
         return '__eval__' + caller() + '__eval__'
 
 
-def _kwarg_parse(formula):
-    names = pd.Series(list(set([node.id for node in ast.walk(ast.parse(formula))
-                                if isinstance(node, ast.Name)])))
-    names = names[~names.isin(['str', 'list', 'dict', 'int', 'float'])]
-    names = names.loc[names.str.len().sort_values(ascending=False).index].to_list()
-    names = [(item, '__' + str(num) + '__',  'kwargs[\'' + item + '\']')
-             for num, item in enumerate(names)]
-    for item in names:
-        formula = formula.replace(item[0],item[1])
-    for item in names:
-        formula = formula.replace(item[1],item[2])
-    return formula
+@functools.lru_cache(maxsize=1024)
+def _compile_eval(formula):
+    """ Compiles an eval expression once.  Template kwargs are bound as the
+    globals of the expression so they are also visible in comprehensions.
+    """
+    return compile(formula.strip(), '<eval>', 'eval')
+
+
+def _eval(formula, kwargs):
+    return eval(_compile_eval(formula), dict(kwargs))
 
 def _make_xlc(template, **kwargs):
         """ Recursively generate xlcompose object"""
@@ -61,33 +64,66 @@ def _make_xlc(template, **kwargs):
                              **sheet_kw)
         if key in ['DataFrame', 'Title', 'CSpacer', 'RSpacer', 'HSpacer',
                    'Series', 'Image']:
+            params = {}
             for k, v in template[key].items():
-                if type(v) is str:
-                    if v[:8] == '__eval__':
-                        v_adj = v.replace('__eval__', '')
-                        template[key][k] =  eval(_kwarg_parse(v_adj))
-            return getattr(core, key)(**template[key])
+                if type(v) is str and v[:8] == '__eval__':
+                    v = _eval(v.replace('__eval__', ''), kwargs)
+                params[k] = v
+            return getattr(core, key)(**params)
 
-def load(template, env, kwargs):
-    if env:
-        env.add_extension(EvalExtension)
-    else:
-        try:
-            path = os.path.dirname(os.path.abspath(template))
-            template = os.path.split(os.path.abspath(template))[-1]
-            env = Environment(loader=FileSystemLoader(path))
-            env.add_extension(EvalExtension)
-            template = env.get_template(template).render(kwargs)
-        except:
+@functools.lru_cache(maxsize=core.settings['template_cache_size'])
+def _cached_template(template, mtime, env):
+    """ Compiles a template file or string.  The modification time of files
+    is part of the cache key so edited templates are compiled again.
+    """
+    if env is None:
+        if mtime is None:
             env = Environment(loader=BaseLoader())
+        else:
+            env = Environment(loader=FileSystemLoader(os.path.dirname(template)))
+        env.add_extension(EvalExtension)
+    if mtime is None:
+        return env.from_string(template)
+    return env.get_template(os.path.basename(template))
+
+
+def _compile_template(template, env=None):
+    """ Compiles a template path or string into a jinja2 Template """
+    if env is not None:
+        if EvalExtension.identifier not in env.extensions:
             env.add_extension(EvalExtension)
-            template = env.from_string(template).render(kwargs)
+        try:
+            # The environment caches and reloads its own templates
+            return env.get_template(template)
+        except (TemplateNotFound, TypeError):
+            return _cached_template(template, None, env)
+    path = os.path.abspath(template)
+    if os.path.isfile(path):
+        return _cached_template(path, os.stat(path).st_mtime_ns, None)
+    return _cached_template(template, None, None)
+
+
+@functools.lru_cache(maxsize=core.settings['template_cache_size'])
+def _parse(template, template_type):
+    """ Parses rendered template text.  Callers own a copy of the result. """
+    if template_type == 'yaml':
+        return yaml.load(template, Loader=yaml.SafeLoader)
+    return json.loads(template)
+
+
+@functools.lru_cache(maxsize=core.settings['template_cache_size'])
+def _quote(template):
+    """ Quotes unrendered jinja expressions so the output parses """
     replace = [item.strip() for item in re.findall('[ :]{{.+}}', template)]
     for item in replace:
         template = template.replace(item, '\'' + item + '\'')
     return template
 
 
+def load(template, env, kwargs):
+    return _quote(_compile_template(template, env).render(kwargs))
+
+
 def load_yaml(template, env=None, str_only=False, **kwargs):
     """ Loads a YAML template specifying the structure of the XLCompose Object.
 
@@ -97,7 +133,8 @@ def load_yaml(template, env=None, str_only=False, **kwargs):
         A string representing the path of a YAML file or a YAML string.
     env: jinja2.Environment (optional)
         The jinja2 environment to be used. If omitted, one will be created at
-        at the location of the template.
+        at the location of the template.  A long-lived environment keeps its
+        compiled templates between calls.
     str_only: bool
         Whether to load the string representation of the template only.  When set
         to True (default), the `xlcompose` object will be constructed.
@@ -106,10 +143,129 @@ def load_yaml(template, env=None, str_only=False, **kwargs):
     if str_only:
         return template
     else:
-        return _make_xlc(yaml.load(template, Loader=yaml.SafeLoader), **kwargs)
+        return _make_xlc(copy.deepcopy(_parse(template, 'yaml')), **kwargs)
 
 def load_json(template, env=None, **kwargs):
     """ Loads a JSON template specifying the structure of the XLCompose Object.
     """
     template = load(template, env, kwargs)
-    return _make_xlc(json.loads(template), **kwargs)
+    return _make_xlc(copy.deepcopy(_parse(template, 'json')), **kwargs)
+
+
+RenderResult = namedtuple(
+    'RenderResult', ['path', 'status', 'error', 'load_time', 'write_time'])
+
+_batch = {}
+
+
+def _init_batch(template, template_type):
+    """ Compiles the template once per worker process of `render_many` """
+    _batch['template'] = _compile_template(template)
+    _batch['template_type'] = template_type
+
+
+def _render_job(job, template=None, template_type=None):
+    """ Renders one workbook of `render_many`.  Worker processes render the
+    template compiled by `_init_batch`.
+    """
+    if template is None:
+        template, template_type = _batch['template'], _batch['template_type']
+    kwargs, path, excel_kwargs = job
+    start = time.perf_counter()
+    load_time = None
+    try:
+        text = _quote(template.render(kwargs))
+        exhibit = _make_xlc(copy.deepcopy(
+            _parse(text, template_type)), **kwargs)
+        load_time = time.perf_counter() - start
+        start = time.perf_counter()
+        exhibit.to_excel(path, **excel_kwargs)
+    except Exception:
+        elapsed = time.perf_counter() - start
+        return RenderResult(
+            path, 'error', traceback.format_exc(),
+            elapsed if load_time is None else load_time,
+            None if load_time is None else elapsed)
+    return RenderResult(
+        path, 'ok', None, load_time, time.perf_counter() - start)
+
+
+def _render_pool(jobs, workers, template, template_type):
+    """ Renders jobs of `render_many` in a pool of worker processes.  Returns
+    the RenderResult of each job, or None for jobs lost to a worker that
+    died.
+    """
+    results = []
+    with ProcessPoolExecutor(workers, initializer=_init_batch,
+                             initargs=(template, template_type)) as pool:
+        futures = [pool.submit(_render_job, job) for job in jobs]
+        for job, future in zip(jobs, futures):
+            try:
+                results.append(future.result())
+            except BrokenProcessPool:
+                results.append(None)
+            except Exception:
+                # Such as kwargs that cannot be sent to a worker
+                results.append(RenderResult(
+                    job[1], 'error', traceback.format_exc(), None, None))
+    return results
+
+
+def render_many(template, kwargs_list, output_paths, workers=None,
+                template_type='yaml', **excel_kwargs):
+    """ Renders one template into many workbooks, one per set of kwargs.
+
+    Parameters
+    ----------
+    template: str (path-like)
+        A string representing the path of a template file or a template
+        string.
+    kwargs_list: list of dict
+        The template variables of each workbook.
+    output_paths: list of str
+        The workbook path of each set of kwargs.
+    workers: int (optional)
+        Number of processes to render in.  If omitted, workbooks are rendered
+        in the calling process.
+    template_type: str
+        Either 'yaml' or 'json'.
+    excel_kwargs:
+        Passed on to `to_excel` for each workbook.
+
+    Returns
+    -------
+        A list of RenderResult with the path, status ('ok' or 'error'), the
+        formatted traceback of failed jobs and the seconds spent loading the
+        template and writing the workbook.  A failing job does not stop the
+        remaining ones, nor do kwargs that cannot be sent to a worker or a
+        worker that dies.
+    """
+    if len(kwargs_list) != len(output_paths):
+        raise ValueError('kwargs_list and output_paths differ in length')
+    jobs = [(kwargs, path, excel_kwargs)
+            for kwargs, path in zip(kwargs_list, output_paths)]
+    if not workers:
+        compiled = _compile_template(template)
+        return [_render_job(job, compiled, template_type) for job in jobs]
+    results = [None] * len(jobs)
+    pending = list(range(len(jobs)))
+    alone = False
+    while pending:
+        # A dying worker breaks the pool and loses the jobs of the others,
+        # which are rendered again.  Once a pool finishes no job at all the
+        # next job is rendered alone, so a job that keeps killing its worker
+        # is reported rather than retried forever.
+        batch = pending[:1] if alone else pending
+        rendered = _render_pool([jobs[num] for num in batch],
+                                1 if alone else workers,
+                                template, template_type)
+        for num, result in zip(batch, rendered):
+            if result is None and alone:
+                result = RenderResult(
+                    jobs[num][1], 'error',
+                    'The worker process rendering the workbook died',
+                    None, None)
+            results[num] = result
+        alone = not alone and all(result is None for result in rendered)
+        pending = [num for num in pending if results[num] is None]
+    return results
@@ -1,6 +1,44 @@
+import gc
+import io
+import os
+import sys
+import tempfile
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
+import pytest
+import xlsxwriter
+from jinja2 import Environment, FileSystemLoader
+from xlsxwriter.sharedstrings import SharedStringTable
 import xlcompose as xlc
 
+NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+def _cells(path, sheet=1):
+    """ Maps cell references of a rendered sheet to their text values """
+    z = zipfile.ZipFile(path)
+    strings = []
+    if 'xl/sharedStrings.xml' in z.namelist():
+        strings = [''.join(t.text or '' for t in si.iter(NS + 't'))
+                   for si in ET.fromstring(
+                       z.read('xl/sharedStrings.xml')).iter(NS + 'si')]
+    root = ET.fromstring(z.read('xl/worksheets/sheet{}.xml'.format(sheet)))
+    cells = {}
+    for c in root.iter(NS + 'c'):
+        v = c.find(NS + 'v')
+        if c.get('t') == 's':
+            cells[c.get('r')] = strings[int(v.text)]
+        elif c.get('t') == 'inlineStr':
+            cells[c.get('r')] = ''.join(t.text or '' for t in c.iter(NS + 't'))
+        else:
+            cells[c.get('r')] = None if v is None else v.text
+    return cells
+
+
 def test_simple_exhibit():
     df=pd.DataFrame({'Fruit': ['Apple', 'Pear'],
                      'Quantity': [1, 2]})
@@ -16,3 +54,592 @@ def test_simple_exhibit():
        ('a_sheet', composite),
        ('another_sheet', composite)
     ).to_excel('workbook.xlsx')
+
+
+def test_constant_memory_nested_layout(tmp_path):
+    tall = pd.DataFrame({'a': np.arange(30.), 'b': ['x'] * 30})
+    short = pd.DataFrame({'c': np.arange(5)})
+    layout = xlc.Row(
+        xlc.Column(xlc.Title('Tall'), xlc.DataFrame(tall)),
+        xlc.RSpacer(),
+        xlc.Column(xlc.DataFrame(short), xlc.CSpacer(), xlc.DataFrame(tall)))
+    layout.to_excel(str(tmp_path / 'default.xlsx'))
+    layout.to_excel(str(tmp_path / 'streamed.xlsx'), constant_memory=True)
+    assert _cells(str(tmp_path / 'streamed.xlsx')) == \
+        _cells(str(tmp_path / 'default.xlsx'))
+
+
+def test_parallel_sheets_match_streamed(tmp_path):
+    df = pd.DataFrame({'a': np.arange(20.), 'b': ['x', 'y'] * 10})
+    book = xlc.Tabs(
+        ('first', xlc.Column(xlc.Title('First'), xlc.DataFrame(df))),
+        ('second', xlc.DataFrame(df, formats={'a': '0.00'})),
+        ('third', xlc.Row(xlc.Series(df['a']), xlc.DataFrame(df.head()))))
+    book.to_excel(str(tmp_path / 'streamed.xlsx'), constant_memory=True)
+    book.to_excel(str(tmp_path / 'parallel.xlsx'), workers=2)
+    streamed = zipfile.ZipFile(str(tmp_path / 'streamed.xlsx'))
+    parallel = zipfile.ZipFile(str(tmp_path / 'parallel.xlsx'))
+    assert streamed.namelist() == parallel.namelist()
+    for name in streamed.namelist():
+        if name != 'docProps/core.xml':
+            assert streamed.read(name) == parallel.read(name), name
+
+
+def test_nesting_shares_data(tmp_path):
+    df = pd.DataFrame({'a': [1.5, np.nan], 'b': ['x', 'y']})
+    exhibit = xlc.DataFrame(df)
+    layout = xlc.Tabs(('s', xlc.Column(xlc.Row(xlc.Column(exhibit)))))
+    leaf = layout[0].layout[0][0][0]
+    assert leaf is not exhibit and leaf.data is exhibit.data
+    layout.to_excel(str(tmp_path / 'first.xlsx'))
+    layout.to_excel(str(tmp_path / 'second.xlsx'))
+    assert _cells(str(tmp_path / 'first.xlsx')) == \
+        _cells(str(tmp_path / 'second.xlsx'))
+
+
+def test_layout_deeper_than_recursion_limit(tmp_path):
+    exhibit = xlc.DataFrame(pd.DataFrame({'a': [1, 2]}))
+    layout = exhibit
+    for num in range(sys.getrecursionlimit() + 100):
+        layout = xlc.Column(layout) if num % 2 else xlc.Row(layout)
+    assert (layout.height, layout.width) == (exhibit.height, exhibit.width)
+    layout.to_excel(str(tmp_path / 'deep.xlsx'))
+    assert _cells(str(tmp_path / 'deep.xlsx'))['B3'] == '2'
+
+
+def test_nested_changes_invalidate_cached_geometry(tmp_path):
+    exhibit = xlc.DataFrame(pd.DataFrame({'a': [1, 2]}))
+    layout = xlc.Row(xlc.Column(exhibit), exhibit)
+    assert layout.row_heights == [None] * 3
+    html = layout._repr_html_()
+    layout.args[0].args = layout.args[0].args * 2
+    assert layout.height == 6 and layout._repr_html_() != html
+    layout.args[0].row_heights = [18] * 6
+    assert layout.row_heights == [18] * 6
+    layout.args[0].column_widths = [5, 6]
+    assert layout.column_widths[:2] == [5, 6]
+    layout.to_excel(str(tmp_path / 'changed.xlsx'))
+    root = ET.fromstring(zipfile.ZipFile(str(tmp_path / 'changed.xlsx')).read(
+        'xl/worksheets/sheet1.xml'))
+    assert [row.get('ht') for row in root.iter(NS + 'row')] == ['18'] * 6
+
+
+def test_formats_are_shared_across_exhibits(tmp_path):
+    df = pd.DataFrame({'a': [1.5, 2.5], 'b': ['x', 'y']})
+    registries = []
+    for count in [1, 20]:
+        layout = xlc.Column(*[
+            xlc.Column(xlc.Title('Exhibit ' + str(num)),
+                       xlc.DataFrame(df, formats={'a': '0.00'}))
+            for num in range(count)])
+        workbook = xlc.core._Workbook(
+            str(tmp_path / 'formats.xlsx'), layout, None)
+        workbook.to_excel()
+        registries.append(workbook.formats)
+    assert registries[0].misses == registries[1].misses == \
+        len(registries[1].formats)
+    assert registries[1].hits > registries[0].hits
+
+
+def test_column_widths_inferred_lazily(monkeypatch):
+    df = pd.DataFrame({'text': ['a', 'bb', 'c' * 20, 'dddd']})
+    exhibit = xlc.DataFrame(df, index=False)
+    layout = xlc.Column(xlc.Title('Title'), exhibit)
+    assert exhibit._inferred == {}
+    assert layout.column_widths == [20 * 1.1]
+    assert type(layout.column_widths[0]) is float
+    monkeypatch.setitem(xlc.core.settings, 'column_width_sample',
+                        {'strategy': 'head', 'rows': 2, 'quantile': 1.0})
+    assert xlc.DataFrame(df, index=False).column_widths == [4 * 1.1]
+
+
+def test_render_many_reports_failures(tmp_path):
+    template = '''
+    Column:
+      - Title:
+          data: {{ title }}
+      - DataFrame:
+          data: {% eval %}data{% endeval %}
+    '''
+    df = pd.DataFrame({'a': [1, 2]})
+    paths = [str(tmp_path / (name + '.xlsx')) for name in 'abc']
+    results = xlc.render_many(
+        template, [{'title': 'A', 'data': df}, {'title': 'B'},
+                   {'title': 'C', 'data': df}], paths, workers=2)
+    assert [item.status for item in results] == ['ok', 'error', 'ok']
+    assert results[1].error
+    assert _cells(paths[2])['A1'] == 'C'
+
+    class Crash:
+        def __reduce__(self):
+            return os._exit, (1,)
+    paths = [str(tmp_path / (name + '.xlsx')) for name in 'defg']
+    results = xlc.render_many(
+        template, [{'title': 'D', 'data': df},
+                   {'title': 'E', 'data': df, 'lock': threading.Lock()},
+                   {'title': 'F', 'data': df, 'crash': Crash()},
+                   {'title': 'G', 'data': df}], paths, workers=2)
+    assert [item.status for item in results] == ['ok', 'error', 'error', 'ok']
+    assert _cells(paths[3])['A1'] == 'G'
+
+
+def test_render_many_threads_keep_their_template(tmp_path):
+    df = pd.DataFrame({'a': [1, 2]})
+
+    def render(name):
+        template = ('Column:\n  - Title:\n      data: ' + name + ' {{ n }}\n'
+                    '  - DataFrame:\n      data: {% eval %}data{% endeval %}\n')
+        paths = [str(tmp_path / '{}{}.xlsx'.format(name, n)) for n in range(10)]
+        xlc.render_many(template, [{'n': n, 'data': df} for n in range(10)],
+                        paths)
+        return [_cells(path)['A1'] for path in paths]
+
+    with ThreadPoolExecutor(2) as pool:
+        results = list(pool.map(render, ['left', 'right']))
+    assert results == [['{} {}'.format(name, n) for n in range(10)]
+                       for name in ['left', 'right']]
+
+
+def test_template_cache(tmp_path):
+    path = tmp_path / 'report.yaml'
+    path.write_text('Title:\n  data: {{ title }}\n')
+    first = xlc.load_yaml(str(path), title='A')
+    xlc.templates._cached_template.cache_clear()
+    xlc.load_yaml(str(path), title='A')
+    xlc.load_yaml(str(path), title='B')
+    assert xlc.templates._cached_template.cache_info().hits == 1
+    path.write_text('Title:\n  data: [{{ title }}, sub]\n')
+    os.utime(str(path), ns=(0, 0))
+    assert xlc.load_yaml(str(path), title='C').data[0].tolist() == ['C', 'sub']
+    assert first.data[0].tolist() == ['A']
+    env = Environment(loader=FileSystemLoader(str(tmp_path)))
+    assert xlc.load_yaml('report.yaml', env=env, title='D').data[0].tolist() == ['D', 'sub']
+    assert xlc.load_yaml('report.yaml', env=env, title='E').data[0].tolist() == ['E', 'sub']
+
+
+def test_eval_expressions_bind_kwargs():
+    template = '''
+    Column:
+      - DataFrame:
+          data: {% eval %}data_2[[col for col in data_2 if col != data]]{% endeval %}
+    '''
+    df = pd.DataFrame({'a': [1], 'b': [2]})
+    xlc.templates._compile_eval.cache_clear()
+    for name in 'ab':
+        exhibit = xlc.load_yaml(template, data=name, data_2=df)
+        assert list(exhibit.args[0].data.columns) == [col for col in 'ab' if col != name]
+    assert xlc.templates._compile_eval.cache_info().misses == 1
+
+
+class _WriteOnly:
+    """ A stream that can only be written to, like a socket """
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def test_to_bytes_and_streams_skip_temp_files(tmp_path, monkeypatch):
+    exhibit = xlc.Column(xlc.Title('Streamed'),
+                         xlc.DataFrame(pd.DataFrame({'a': [1.5, 2.5]})))
+    exhibit.to_excel(str(tmp_path / 'file.xlsx'))
+
+    def mkstemp(*args, **kwargs):
+        raise AssertionError('temporary file created')
+    monkeypatch.setattr(tempfile, 'mkstemp', mkstemp)
+    stream = _WriteOnly()
+    exhibit.to_excel(stream)
+    for content in [exhibit.to_bytes(), b''.join(stream.chunks)]:
+        assert _cells(io.BytesIO(content)) == _cells(str(tmp_path / 'file.xlsx'))
+    monkeypatch.undo()
+    cache = str(tmp_path / 'cache')
+    for options in [{'backend': 'table', 'column_formats': True},
+                    {'workers': 2}, {'cache_dir': cache}]:
+        content = exhibit.to_bytes(**options)
+        assert _cells(io.BytesIO(content)) == _cells(str(tmp_path / 'file.xlsx'))
+    assert os.listdir(cache)
+
+
+def test_render_stats(tmp_path):
+    df = pd.DataFrame({'a': [1.5, 2.5, 3.5], 'b': ['x', 'y', 'z']})
+    book = xlc.Tabs(('one', xlc.Column(xlc.Title(['T', 'sub']), xlc.DataFrame(df))),
+                    ('two', xlc.DataFrame(df, index=False)))
+    assert book.to_excel(str(tmp_path / 'plain.xlsx')) is None
+    events = []
+    for options in [{}, {'constant_memory': True}, {'workers': 2}]:
+        stats = book.to_excel(str(tmp_path / 'stats.xlsx'), hooks=[
+            lambda kind, name, seconds: events.append((kind, name))],
+            **options)
+        assert set(stats.sheets) == {'one', 'two'}
+        assert {'compile', 'layout', 'properties', 'close'} <= set(stats.phases)
+        # two title rows, a header with an index column and 3 rows of data
+        # then a header and 3 rows without the index
+        assert stats.cells == 2 + 3 * 4 + 2 * 4
+        assert stats.formats_created > 0
+    assert ('sheets', 'one') in events and ('phases', 'close') in events
+
+
+def test_cached_sheets_are_reused(tmp_path, monkeypatch):
+    df = pd.DataFrame({'a': np.arange(10.), 'b': ['x', 'y'] * 5})
+
+    def book(changed):
+        return xlc.Tabs(
+            ('first', xlc.Column(xlc.Title('First'), xlc.DataFrame(df))),
+            ('second', xlc.DataFrame(changed)),
+            ('third', xlc.Series(df['a'])))
+    cache = str(tmp_path / 'cache')
+    stats = book(df).to_excel(str(tmp_path / 'old.xlsx'), cache_dir=cache,
+                              stats=True)
+    assert stats.sheets_reused == 0
+    changed = df.assign(a=df['a'] + 1)
+    stats = book(changed).to_excel(str(tmp_path / 'new.xlsx'),
+                                   cache_dir=cache, stats=True)
+    assert stats.sheets_reused == 2 and list(stats.sheets) == ['second']
+    book(changed).to_excel(str(tmp_path / 'streamed.xlsx'),
+                           constant_memory=True)
+    streamed = zipfile.ZipFile(str(tmp_path / 'streamed.xlsx'))
+    cached = zipfile.ZipFile(str(tmp_path / 'new.xlsx'))
+    for name in streamed.namelist():
+        if name != 'docProps/core.xml':
+            assert streamed.read(name) == cached.read(name), name
+    mixed = pd.DataFrame({'a': [1, 'a']})
+    xlc.DataFrame(mixed).to_excel(str(tmp_path / 'mixed.xlsx'),
+                                  cache_dir=cache)
+    text = pd.DataFrame({'a': ['1', 'a']}, dtype=object)
+    xlc.DataFrame(text).to_excel(str(tmp_path / 'text.xlsx'), cache_dir=cache)
+    assert _cells(str(tmp_path / 'text.xlsx'))['B2'] == '1'
+    root = ET.fromstring(zipfile.ZipFile(str(tmp_path / 'text.xlsx')).read(
+        'xl/worksheets/sheet1.xml'))
+    assert [c.get('t') for c in root.iter(NS + 'c') if c.get('r') == 'B2'] \
+        == ['inlineStr']
+    monkeypatch.setattr(xlc.core, '_fingerprint', lambda *args: None)
+    stats = book(changed).to_excel(str(tmp_path / 'unhashed.xlsx'),
+                                   cache_dir=cache, stats=True)
+    assert stats.sheets_reused == 0
+
+
+def test_typed_column_writers(tmp_path):
+    df = pd.DataFrame({
+        'text': ['=SUM(A1)', 'http://x.com', None],
+        'flag': [True, False, True],
+        'when': pd.to_datetime(['1900-01-01 00:00', None, '2020-01-01 12:00']),
+        'amount': [1.5, np.nan, 3]})
+    xlc.DataFrame(df, index=False).to_excel(str(tmp_path / 'typed.xlsx'))
+    cells = _cells(str(tmp_path / 'typed.xlsx'))
+    assert [cells[ref] for ref in ['A2', 'A3', 'B2', 'C2', 'C4', 'D2']] == \
+        ['=SUM(A1)', 'http://x.com', '1', '0', '43831.5', '1.5']
+    root = ET.fromstring(zipfile.ZipFile(str(tmp_path / 'typed.xlsx')).read(
+        'xl/worksheets/sheet1.xml'))
+    assert not list(root.iter(NS + 'f')) and not list(root.iter(NS + 'hyperlink'))
+    assert cells.get('C3') is None and cells.get('D3') is None
+
+
+def test_missing_values_of_nullable_strings(tmp_path):
+    df = pd.DataFrame({'a': pd.array(['a', None, ''], dtype='string'),
+                       'b': pd.Series(['x', pd.NA, 'y'], dtype=object)})
+    xlc.DataFrame(df, index=False).to_excel(str(tmp_path / 'na.xlsx'))
+    cells = _cells(str(tmp_path / 'na.xlsx'))
+    assert (cells['A2'], cells['B2'], cells['B4']) == ('a', 'x', 'y')
+    assert cells.get('A3') is None and cells.get('A4') is None
+
+
+def test_sparse_skips_missing_cells(tmp_path):
+    tri = pd.DataFrame([[1., 2.], [3., np.nan]])
+    xlc.DataFrame(tri, sparse=True).to_excel(str(tmp_path / 'sparse.xlsx'))
+    xlc.DataFrame(tri).to_excel(str(tmp_path / 'dense.xlsx'))
+    xlc.DataFrame(tri, sparse=True, formats={'border': 1}).to_excel(
+        str(tmp_path / 'border.xlsx'))
+    dense = _cells(str(tmp_path / 'dense.xlsx'))
+    sparse = _cells(str(tmp_path / 'sparse.xlsx'))
+    assert dense.pop('C3') is None and sparse == dense
+    # the skipped cell is not counted as written by any writer
+    for options in [{}, {'constant_memory': True}, {'backend': 'table'}]:
+        stats = xlc.DataFrame(tri, index=False, sparse=True).to_excel(
+            str(tmp_path / 'stats.xlsx'), stats=True, **options)
+        assert stats.cells == 2 + 3
+    exhibit = xlc.DataFrame(tri, index=False, formats={'num_format': '0.0'})
+    stats = exhibit.to_excel(str(tmp_path / 'stats.xlsx'), stats=True,
+                             column_formats=True)
+    assert stats.cells == 2 + 3
+    assert 'C3' in _cells(str(tmp_path / 'border.xlsx'))
+
+
+def test_overflow_splits_into_continuation_sheets(tmp_path, monkeypatch):
+    monkeypatch.setattr(xlc.core, 'EXCEL_MAX_ROWS', 4)
+    monkeypatch.setattr(xlc.core, 'EXCEL_MAX_COLS', 3)
+    df = pd.DataFrame({'a': range(5), 'b': range(5), 'c': range(5)})
+    with pytest.raises(ValueError):
+        xlc.Sheet('data', xlc.DataFrame(df)).to_excel(str(tmp_path / 'x.xlsx'))
+    xlc.Sheet('data', xlc.DataFrame(df), overflow='split').to_excel(
+        str(tmp_path / 'split.xlsx'))
+    names = [item.name for item in xlc.core._compile(
+        xlc.DataFrame(df, overflow='split'))]
+    assert names == ['sheet1'] + ['sheet1 ({})'.format(n) for n in range(2, 5)]
+    long = 'x' * 31
+    names = [item.name for item in xlc.core._compile(xlc.Tabs(
+        (long, xlc.DataFrame(df, overflow='split')),
+        ('X' * 27 + ' (3)', xlc.DataFrame(df[['a']].head(1)))))]
+    assert names == [long, 'x' * 27 + ' (2)', 'x' * 27 + ' (4)',
+                     'x' * 27 + ' (5)', 'X' * 27 + ' (3)']
+    # three data rows and two data columns per sheet, header repeated
+    assert _cells(str(tmp_path / 'split.xlsx'), 1) == {
+        'A1': None, 'B1': 'a', 'C1': 'b', 'A2': '0', 'A3': '1', 'A4': '2',
+        'B2': '0', 'B3': '1', 'B4': '2', 'C2': '0', 'C3': '1', 'C4': '2'}
+    assert _cells(str(tmp_path / 'split.xlsx'), 4) == {
+        'A1': None, 'B1': 'c', 'A2': '3', 'A3': '4', 'B2': '3', 'B3': '4'}
+    xlc.DataFrame(df, table=True, overflow='split').to_excel(
+        str(tmp_path / 'tables.xlsx'))
+    package = zipfile.ZipFile(str(tmp_path / 'tables.xlsx'))
+    refs = sorted(ET.fromstring(package.read(name)).get('ref')
+                  for name in package.namelist()
+                  if name.startswith('xl/tables/'))
+    assert refs == ['A1:B3', 'A1:B4', 'A1:C3', 'A1:C4']
+    chunked = xlc.DataFrame(iter([df]), schema=df.iloc[:0], nrows=len(df),
+                            overflow='split')
+    with pytest.raises(ValueError):
+        chunked.to_excel(str(tmp_path / 'chunked.xlsx'))
+
+
+def test_chunked_data_matches_frame(tmp_path):
+    df = pd.DataFrame({'a': np.arange(25.), 'b': ['x', None, 'z', 'w', 'v'] * 5},
+                      index=range(100, 125))
+    def chunks():
+        for start in range(0, len(df), 7):
+            yield df.iloc[start:start + 7]
+    def layout(data):
+        return xlc.Row(xlc.Column(xlc.Title('Chunked'), data), xlc.DataFrame(df))
+    layout(xlc.DataFrame(df)).to_excel(str(tmp_path / 'frame.xlsx'))
+    for options in [{}, {'constant_memory': True}]:
+        path = str(tmp_path / 'chunked.xlsx')
+        exhibit = xlc.DataFrame(chunks(), schema=df.iloc[:0], nrows=len(df))
+        layout(exhibit).to_excel(path, **options)
+        assert _cells(path) == _cells(str(tmp_path / 'frame.xlsx'))
+        with pytest.raises(ValueError):
+            layout(exhibit).to_excel(path, **options)
+    exhibit = xlc.DataFrame(chunks(), schema=df.iloc[:0], nrows=20)
+    with pytest.raises(ValueError):
+        exhibit.to_excel(str(tmp_path / 'long.xlsx'))
+
+
+def test_deferred_data_materializes_at_write(tmp_path):
+    df = pd.DataFrame({'a': np.arange(5.), 'b': list('vwxyz')})
+    calls = []
+    def load():
+        calls.append(1)
+        return df
+    exhibit = xlc.DataFrame(load, schema={'a': 'float64', 'b': object},
+                            nrows=len(df), column_widths=[5, 12, 5])
+    layout = xlc.Column(xlc.Title('Deferred'), exhibit)
+    assert (layout.height, layout.width) == (7, 3) and not calls
+    xlc.Column(xlc.Title('Deferred'), xlc.DataFrame(df)).to_excel(
+        str(tmp_path / 'frame.xlsx'))
+    for options in [{}, {'constant_memory': True}]:
+        path = str(tmp_path / 'deferred.xlsx')
+        layout.to_excel(path, **options)
+        assert _cells(path) == _cells(str(tmp_path / 'frame.xlsx'))
+    assert len(calls) == 2
+    schema = {'a': 'float64', 'b': object}
+    exhibit = xlc.DataFrame(load, schema=schema, nrows=len(df))
+    assert exhibit.column_widths == xlc.DataFrame(df).column_widths
+    assert exhibit.column_widths[0] > 0 and len(calls) == 3
+    exhibit = xlc.DataFrame(lambda: iter([df.iloc[:2], df.iloc[2:]]),
+                            schema=schema, nrows=len(df))
+    assert exhibit.column_widths == xlc.DataFrame(df.iloc[:2]).column_widths
+
+
+def test_dataframe_as_excel_table(tmp_path):
+    template = '''
+    Column:
+      - Title:
+          data: Claims
+      - DataFrame:
+          data: {% eval %}data{% endeval %}
+          table: true
+          table_style: Table Style Light 9
+          index_label: state
+    '''
+    df = pd.DataFrame({'paid': [1.5, 2.5]}, index=['CA', 'NY'])
+    path = str(tmp_path / 'table.xlsx')
+    xlc.load_yaml(template, data=df).to_excel(path)
+    package = zipfile.ZipFile(path)
+    table = ET.fromstring(package.read('xl/tables/table1.xml'))
+    assert table.get('ref') == 'A2:B4'
+    assert table.find(NS + 'tableStyleInfo').get('name') == 'TableStyleLight9'
+    assert [item.get('name') for item in table.iter(NS + 'tableColumn')] == \
+        ['state', 'paid']
+    dxfs = ET.fromstring(package.read('xl/styles.xml')).find(NS + 'dxfs')
+    assert dxfs.get('count') == str(len(dxfs)) == '2'
+    assert [item.get('dataDxfId') for item in
+            table.iter(NS + 'tableColumn')] == ['0', '1']
+    cells = _cells(path)
+    assert [cells[ref] for ref in ['A2', 'B2', 'A3', 'B4']] == \
+        ['state', 'paid', 'CA', '2.5']
+    for options in [{'constant_memory': True}, {'workers': 2}]:
+        with pytest.raises(ValueError):
+            xlc.DataFrame(df, table=True).to_excel(path, **options)
+
+
+def test_column_formats(tmp_path):
+    frame = pd.DataFrame({'a': [1., np.nan], 'b': [3., 4.]})
+    path = str(tmp_path / 'cols.xlsx')
+    xlc.DataFrame(frame, index=False, formats={'num_format': '0.0'}).to_excel(
+        path, column_formats=True)
+    cols = ET.fromstring(zipfile.ZipFile(path).read(
+        'xl/worksheets/sheet1.xml')).find(NS + 'cols')
+    assert all(col.get('style') for col in cols)
+    assert 'A3' not in _cells(path) and _cells(path)['B3'] == '4'
+    xlc.Column(
+        xlc.DataFrame(frame, index=False, formats={'num_format': '0.0'}),
+        xlc.DataFrame(frame, index=False, formats={'num_format': '0%'})
+    ).to_excel(path, column_formats=True)
+    cols = ET.fromstring(zipfile.ZipFile(path).read(
+        'xl/worksheets/sheet1.xml')).find(NS + 'cols')
+    assert not any(col.get('style') for col in cols)
+
+
+def test_html_preview(monkeypatch):
+    frame = pd.DataFrame({'a': np.arange(1000)})
+    layout = xlc.DataFrame(frame)
+    for num in range(sys.getrecursionlimit() + 100):
+        layout = xlc.Column(layout) if num % 2 else xlc.Row(layout)
+    html = layout._repr_html_()
+    assert html.count('class="xlccontainer-DataFrame"') == 1 and '<table' not in html
+    monkeypatch.setattr(xlc.Column, '_contents_html', None)
+    monkeypatch.setattr(xlc.Row, '_contents_html', None)
+    assert layout._repr_html_() == html
+    monkeypatch.undo()
+    monkeypatch.setitem(xlc.core.settings['html_preview'], 'rows', 2)
+    html = layout._repr_html_()
+    assert '>998<' in html and '>2<' not in html and '<table' in html
+
+
+def test_arrow_data_matches_pandas(tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    df = pd.DataFrame({
+        'f': [1.5, None, 3.], 'i': [1, 2, 3], 'b': [True, False, True],
+        'd': pd.to_datetime(['2020-01-01', None, '2020-03-01']),
+        's': ['x', None, 'z']})
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    exhibit = xlc.DataFrame(table, index=False)
+    assert exhibit.formats == xlc.DataFrame(df, index=False).formats
+    assert [exhibit.formats[name].get('num_format') for name in 'fidbs'] == \
+        ['#,0.00', '#,0', 'yyyy-mm-dd hh:mm', None, None]
+    exhibit.to_excel(str(tmp_path / 'arrow.xlsx'))
+    xlc.DataFrame(df, index=False).to_excel(str(tmp_path / 'frame.xlsx'))
+    assert _cells(str(tmp_path / 'arrow.xlsx')) == \
+        _cells(str(tmp_path / 'frame.xlsx'))
+    table = pa.table({
+        'ts': pa.array([1577836800000000, None], pa.timestamp('us')),
+        'dt': pa.array([18262, None], pa.date32()),
+        'sv': pa.array(['x', None], pa.string_view())})
+    df = pd.DataFrame({'ts': pd.to_datetime(['2020-01-01', None]),
+                       'dt': pd.to_datetime(['2020-01-01', None]),
+                       'sv': ['x', None]})
+    xlc.DataFrame(table).to_excel(str(tmp_path / 'arrow.xlsx'))
+    xlc.DataFrame(df).to_excel(str(tmp_path / 'frame.xlsx'))
+    # Cells and their formats match, column widths are sized from text
+    parts = [zipfile.ZipFile(str(tmp_path / name))
+             for name in ['arrow.xlsx', 'frame.xlsx']]
+    cells = [ET.tostring(ET.fromstring(part.read('xl/worksheets/sheet1.xml'))
+                         .find(NS + 'sheetData')) for part in parts]
+    assert cells[0] == cells[1]
+    assert parts[0].read('xl/styles.xml') == parts[1].read('xl/styles.xml')
+    zoned = pa.table({'ts': pa.array([0], pa.timestamp('us', 'UTC'))})
+    with pytest.raises(TypeError):
+        xlc.DataFrame(zoned).to_excel(str(tmp_path / 'zoned.xlsx'))
+
+
+def test_table_backend_matches_xlsxwriter(tmp_path):
+    df = pd.DataFrame({
+        'f': [1.5, np.nan, 3.], 'i': [1, 2, 3], 'b': [True, False, True],
+        'd': pd.to_datetime(['2020-01-01', None, '2020-03-01']),
+        's': ['x', None, 'y'], 'o': [1, 'a', None]})
+    layout = xlc.Column(
+        xlc.Title('Backends'), xlc.DataFrame(df),
+        xlc.DataFrame(df.iloc[::-1], sparse=True),
+        xlc.DataFrame(df, formats={'border': 1}, sparse=True))
+    layout.to_excel(str(tmp_path / 'cells.xlsx'))
+    blocks = []
+    layout.to_excel(str(tmp_path / 'table.xlsx'), backend='table')
+    layout.to_excel(str(tmp_path / 'custom.xlsx'),
+                    backend=lambda block, ws: blocks.append(block.write(ws)))
+    assert blocks
+    for name in ['table', 'custom']:
+        expected = zipfile.ZipFile(str(tmp_path / 'cells.xlsx'))
+        package = zipfile.ZipFile(str(tmp_path / (name + '.xlsx')))
+        for part in ['xl/worksheets/sheet1.xml', 'xl/sharedStrings.xml']:
+            assert package.read(part) == expected.read(part)
+
+
+def test_table_backend_checks_xlsxwriter(tmp_path, monkeypatch):
+    assert xlc.core._table_backend_supported()
+    monkeypatch.delattr(xlsxwriter.worksheet.Worksheet, '_check_dimensions')
+    assert not xlc.core._table_backend_supported()
+    monkeypatch.undo()
+
+    def fail(*args):
+        raise RuntimeError('failed')
+    monkeypatch.setattr(xlc.core, '_fill_column', fail)
+    with pytest.raises(RuntimeError):
+        xlc.DataFrame(pd.DataFrame({'a': [1.5]})).to_excel(
+            str(tmp_path / 'failed.xlsx'), backend='table')
+    assert gc.isenabled()
+
+
+def test_categorical_strings_interned_once(tmp_path, monkeypatch):
+    text = pd.Series(['NY', 'CA', None, 'NY', '', 'TX', 'CA'] * 50)
+    frames = {
+        'plain': pd.DataFrame({'state': text}),
+        'categorical': pd.DataFrame({'state': text.astype('category')}),
+        'encoded': pd.DataFrame({'state': text})}
+    interned = []
+    intern = SharedStringTable._get_shared_string_index
+    monkeypatch.setattr(
+        SharedStringTable, '_get_shared_string_index',
+        lambda self, string: interned.append(string) or intern(self, string))
+    for name, frame in frames.items():
+        for backend in ['xlsxwriter', 'table']:
+            del interned[:]
+            exhibit = xlc.DataFrame(frame, index=False,
+                                    dictionary_encode=name == 'encoded')
+            exhibit.to_excel(str(tmp_path / (name + backend + '.xlsx')),
+                             backend=backend)
+            if backend == 'table':
+                assert sorted(interned) == ['CA', 'NY', 'TX', 'state']
+    expected = zipfile.ZipFile(str(tmp_path / 'plainxlsxwriter.xlsx'))
+    for name in ['plaintable', 'categoricalxlsxwriter', 'categoricaltable',
+                 'encodedtable']:
+        package = zipfile.ZipFile(str(tmp_path / (name + '.xlsx')))
+        for part in ['xl/worksheets/sheet1.xml', 'xl/sharedStrings.xml']:
+            assert package.read(part) == expected.read(part)
+
+
+def test_arrow_dictionaries_are_encoded(tmp_path, monkeypatch):
+    pa = pytest.importorskip('pyarrow')
+    text = ['NY', 'CA', None, 'NY', '', 'TX', 'CA'] * 50
+    table = pa.table({'state': pa.chunked_array([
+        pa.array(text[:100]).dictionary_encode(),
+        pa.array(text[100:]).dictionary_encode()])})
+    encoded = []
+
+    class Encoded(xlc.core._Encoded):
+        def __init__(self, column):
+            encoded.append(column.dtype.name)
+            super().__init__(column)
+    monkeypatch.setattr(xlc.core, '_Encoded', Encoded)
+    xlc.DataFrame(pd.DataFrame({'state': text}), index=False).to_excel(
+        str(tmp_path / 'plain.xlsx'))
+    assert encoded == []
+    for backend in ['xlsxwriter', 'table']:
+        xlc.DataFrame(table, index=False).to_excel(
+            str(tmp_path / (backend + '.xlsx')), backend=backend)
+        package = zipfile.ZipFile(str(tmp_path / (backend + '.xlsx')))
+        for part in ['xl/worksheets/sheet1.xml', 'xl/sharedStrings.xml']:
+            assert package.read(part) == zipfile.ZipFile(
+                str(tmp_path / 'plain.xlsx')).read(part)
+    assert encoded == ['category'] * 2